@@ -1,54 +1,73 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session
-from flask_bcrypt import Bcrypt
-import pyodbc
-from tmdb_client import get_movies_by_genres_and_keywords, get_movie_details
-from llm_analyzer import analyze_user_input
+from flask import Flask, render_template, request, redirect, url_for, flash, session, Response, stream_template, jsonify, abort, make_response
+from db import get_connection
+import comments as comment_store
+import favorites as favorite_store
+from recommendation_log import HistoryPage
+import recommender
+import recommend_jobs
+import tmdb_client
+from tmdb_client import get_movie_details_many, get_movie_page_async
+import llm_analyzer
+import fragment_cache
+import poster_cache
+import discover_prewarm
+import metrics
+import resilience
+import db
+import password_hasher
+from password_hasher import HasherBusy
+import hashlib
 import random
-import smtplib
-from email.mime.text import MIMEText
 from dotenv import load_dotenv
-from tmdb_client import get_watch_providers
-from collections import defaultdict
 import os
 
 load_dotenv()
 EMAIL_USER = os.getenv("EMAIL_USER")
 EMAIL_PASS = os.getenv("EMAIL_PASS")
+HISTORY_STREAM = os.getenv("HISTORY_STREAM", "0") == "1"
+COMMENTS_PAGE_SIZE = int(os.getenv("COMMENTS_PAGE_SIZE", 20))
+# Açıksa öneri formu sonuçları sayfa yenilemeden, hazır oldukça (SSE ile) gösterir
+RECOMMEND_ASYNC = os.getenv("RECOMMEND_ASYNC", "0") == "1"
+# bcrypt süreç havuzu doluyken (HasherBusy) kullanıcıya gösterilen mesaj; yanıt 503 döner
+BUSY_MESSAGE = "⏳ Sistem şu an çok yoğun, lütfen birkaç saniye sonra tekrar deneyin."
 
 app = Flask(__name__)
 app.secret_key = "moodflix_secret_key"
-bcrypt = Bcrypt(app)
-
-def get_connection():
-    return pyodbc.connect(
-        'DRIVER={ODBC Driver 17 for SQL Server};'
-        'SERVER=localhost\\SQLEXPRESS;'
-        'DATABASE=MoodFlixDB;'
-        'Trusted_Connection=yes;'
-    )
-def analyze_user_history(user_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT RecommendedMovie, QuestionText
-        FROM Recommendations
-        WHERE UserId = ?
-        ORDER BY Timestamp DESC
-        """, (user_id,))
-    
-    rows = cursor.fetchall()
-    conn.close()
-
-    if not rows:
-        return None
-
-    # En çok geçen kelimeleri ve türleri basitçe analiz et
-    all_questions = " ".join(row.QuestionText for row in rows)
-    return analyze_user_input(all_questions)
 
+def collect_metrics():
+    """/metrics için önbellek, bağlantı havuzu ve analiz aşaması sayaçları."""
+    caches = (list(tmdb_client.cache_stats().values()) + [llm_analyzer.analysis_cache.stats()]
+              + fragment_cache.stats() + [favorite_store.cache_stats()])
+    batcher_stats = llm_analyzer.batcher.stats() if llm_analyzer.batcher else {}
+    return (metrics.cache_lines(caches)
+            + metrics.gauge_lines("moodflix_llm_batcher", "Gemini mikro-toplama sayaçları", batcher_stats, "field")
+            + metrics.gauge_lines("moodflix_db_pool", "Bağlantı havuzu durumu", db.pool.stats(), "field")
+            + metrics.gauge_lines("moodflix_analyzer_stage_total", "Analizi sonuçlandıran aşama sayısı",
+                                  llm_analyzer.stage_counts, "stage")
+            + metrics.gauge_lines("moodflix_password_hasher", "bcrypt süreç havuzu durumu",
+                                  password_hasher.hasher.stats(), "field")
+            + metrics.gauge_lines("moodflix_circuit_breaker", "Dış servis devre kesicileri (durum: 0 kapalı, 1 yarı açık, 2 açık)",
+                                  resilience.stats(), "field")
+            + metrics.gauge_lines("moodflix_poster_cache", "Afiş disk önbelleği durumu",
+                                  poster_cache.stats(), "field")
+            + metrics.gauge_lines("moodflix_discover_prewarm", "Önceden hazırlanan discover sonuçları",
+                                  discover_prewarm.stats(), "field"))
+
+# Server-Timing başlığı, /metrics uç noktası ve isteğe bağlı profiler
+metrics.init_app(app, collectors=[collect_metrics])
+# Her isteğin TMDb ve Gemini çağrıları REQUEST_BUDGET saniyeyle sınırlıdır
+resilience.init_app(app)
+
+# Tür kombinasyonlarının discover sonuçları arka planda hazırlanır (DISCOVER_PREWARM=1);
+# zamanlayıcı fork'tan sonra, her işçide ilk istekte başlar
+if discover_prewarm.PREWARM_ENABLED:
+    discover_prewarm.init_app(app)
 
 def send_reset_code(email, code):
+    # E-posta modülleri sadece şifre sıfırlamada gerekir
+    import smtplib
+    from email.mime.text import MIMEText
+
     msg = MIMEText(f"\u015eifre s\u0131f\u0131rlama kodunuz: {code}")
     msg["Subject"] = "MoodFlix \u015eifre S\u0131f\u0131rlama"
     msg["From"] = EMAIL_USER
@@ -76,20 +95,22 @@ def register():
         username = request.form["username"]
         email = request.form["email"]
         password = request.form["password"]
-        password_hash = bcrypt.generate_password_hash(password).decode("utf-8")
-
-        conn = get_connection()
-        cursor = conn.cursor()
         try:
-            cursor.execute("INSERT INTO Users (Username, Email, PasswordHash) VALUES (?, ?, ?)",
-                           (username, email, password_hash))
-            conn.commit()
-            flash("K\u0131yat ba\u015far\u0131l\u0131!", "success")
-            return redirect(url_for("login"))
-        except:
-            flash("Kullan\u0131c\u0131 ad\u0131 veya e-posta zaten var!", "danger")
-        finally:
-            conn.close()
+            password_hash = password_hasher.hash_password(password)
+        except HasherBusy:
+            flash(BUSY_MESSAGE, "danger")
+            return render_template("register.html"), 503
+
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("INSERT INTO Users (Username, Email, PasswordHash) VALUES (?, ?, ?)",
+                               (username, email, password_hash))
+                conn.commit()
+                flash("K\u0131yat ba\u015far\u0131l\u0131!", "success")
+                return redirect(url_for("login"))
+            except:
+                flash("Kullan\u0131c\u0131 ad\u0131 veya e-posta zaten var!", "danger")
     return render_template("register.html")
 
 @app.route("/login", methods=["GET", "POST"])
@@ -97,13 +118,21 @@ def login():
     if request.method == "POST":
         username = request.form["username"]
         password = request.form["password"]
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT Id, PasswordHash FROM Users WHERE Username = ?", (username,))
-        user = cursor.fetchone()
-        conn.close()
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT Id, PasswordHash FROM Users WHERE Username = ?", (username,))
+            user = cursor.fetchone()
 
-        if user and bcrypt.check_password_hash(user.PasswordHash, password):
+        try:
+            valid = user is not None and password_hasher.check_password(user.PasswordHash, password)
+        except HasherBusy:
+            flash(BUSY_MESSAGE, "danger")
+            return render_template("login.html"), 503
+
+        if valid:
+            # Maliyet ayarı değiştiyse özeti yeni maliyetle yenile (şifre yalnızca burada açık olarak elimizde)
+            if password_hasher.needs_rehash(user.PasswordHash):
+                upgrade_password_hash(user.Id, password)
             session["user_id"] = user.Id
             session["username"] = username
             return redirect(url_for("index"))
@@ -111,6 +140,17 @@ def login():
             flash("Kullan\u0131c\u0131 ad\u0131 veya \u015fifre hatal\u0131!", "danger")
     return render_template("login.html")
 
+def upgrade_password_hash(user_id, password):
+    try:
+        new_hash = password_hasher.hash_password(password)
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE Users SET PasswordHash = ? WHERE Id = ?", (new_hash, user_id))
+            conn.commit()
+    except Exception as e:
+        # Giriş yine de başarılı sayılır; yenileme bir sonraki girişte tekrar denenir
+        print("❌ Şifre özeti yenilenemedi:", e)
+
 @app.route("/logout")
 def logout():
     session.clear()
@@ -122,116 +162,137 @@ def recommend():
     if "user_id" not in session:
         return redirect(url_for("login"))
 
-    movies = []
-    error = None
+    top_movie, other_movies, error = None, [], None
 
     if request.method == "POST":
-        user_input = request.form.get("user_input")
+        top_movie, other_movies, error = recommender.run(session["user_id"], request.form.get("user_input"))
 
-        try:
-            if user_input:
-                result = analyze_user_input(user_input)
-            else:
-                result = analyze_user_history(session["user_id"])  # Özel öneri geçmişten
-
-            if result:
-                genres = result.get("turler", [])
-                keywords = result.get("anahtar_kelimeler", [])
-
-                if not genres:
-                    error = "🎬 Ruh haline göre film bulamadık. Lütfen bir şeyler yaz."
-                else:
-                    movies = get_movies_by_genres_and_keywords(genres, keywords)
-                    if not movies:
-                        error = "🎭 Üzgünüz, bu duyguya uygun film bulunamadı."
-                    else:
-                        # Sadece kullanıcı bir şey yazdıysa veritabanına kaydet
-                        if user_input:
-                            conn = get_connection()
-                            cursor = conn.cursor()
-                            for movie in movies:
-                                cursor.execute("""
-                                    INSERT INTO Recommendations (UserId, QuestionText, RecommendedMovie, RecommendedMovieId)
-                                    VALUES (?, ?, ?, ?)
-                                """, (
-                                    session["user_id"],
-                                    user_input,
-                                    movie["title"],
-                                    movie["id"]
-                                ))
-                            conn.commit()
-                            conn.close()
-            else:
-                error = "Henüz seninle ilgili öneri geçmişimiz yok. Ruh halini yazıp başlayabilirsin 🎬"
+    return render_template("recommend.html", top_movie=top_movie, other_movies=other_movies, error=error,
+                           async_mode=RECOMMEND_ASYNC)
 
-        except Exception as e:
-            print("❌ Hata:", e)
-            error = "⚠️ Sistem, yazdıklarını anlayamadı. Lütfen ruh halinle ilgili bir şeyler yaz (örneğin: 'Yorgunum ve hüzünlüyüm')."
+@app.route("/recommend/async", methods=["POST"])
+def recommend_async():
+    if "user_id" not in session:
+        return jsonify({"error": "login required"}), 401
 
-    # Önerileri ayır: 1 tanesi en popüler (en üstte gösterilecek)
-    if movies:
-        top_movie = max(movies, key=lambda x: x["vote_average"])
-        other_movies = [m for m in movies if m["id"] != top_movie["id"]]
-    else:
-        top_movie = None
-        other_movies = []
+    # İstek beklemeden döner; sonuçlar /recommend/stream/<job_id> üzerinden akıtılır
+    job = recommend_jobs.start(session["user_id"], request.form.get("user_input"))
+    return jsonify({"job_id": job.id, "stream_url": url_for("recommend_stream", job_id=job.id)}), 202
 
-    return render_template("recommend.html", top_movie=top_movie, other_movies=other_movies, error=error)
+@app.route("/recommend/stream/<job_id>")
+def recommend_stream(job_id):
+    if "user_id" not in session:
+        return redirect(url_for("login"))
+
+    job = recommend_jobs.get(job_id, session["user_id"])
+    if job is None:
+        abort(404)
+
+    return Response(
+        recommend_jobs.sse_stream(job, request.headers.get("Last-Event-ID")),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.route("/movie/<int:movie_id>", methods=["GET", "POST"])
 def movie_detail(movie_id):
     if "user_id" not in session:
         return redirect(url_for("login"))
 
-    movie = get_movie_details(movie_id)
-    if not movie:
-        flash("Film bulunamad\u0131!", "danger")
-        return redirect(url_for("recommend"))
-    
-    # Film detaylarını al
-        movie = get_movie_details(movie_id)
-        platforms = get_watch_providers(movie_id)  # ✅ platformları çek
-
     if request.method == "POST":
         comment_text = request.form.get("comment_text")
         if comment_text:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO Comments (UserId, MovieId, CommentText) VALUES (?, ?, ?)",
-                           (session["user_id"], movie_id, comment_text))
-            conn.commit()
-            conn.close()
+            comment_store.add(session["user_id"], movie_id, comment_text)
+            fragment_cache.invalidate_comments(movie_id)
             flash("Yorum eklendi.", "success")
             return redirect(url_for("movie_detail", movie_id=movie_id))
 
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT Users.Username, Comments.CommentText, Comments.CreatedAt FROM Comments JOIN Users ON Comments.UserId = Users.Id WHERE MovieId = ? ORDER BY CreatedAt DESC", (movie_id,))
-    rows = cursor.fetchall()
-    comments = [{"username": row.Username, "comment_text": row.CommentText, "created_at": row.CreatedAt.strftime("%d.%m.%Y %H:%M")} for row in rows]
+    # Film bilgisi bloğu önbellekte yoksa detaylar, oyuncular ve platformlar tek TMDb çağrısıyla
+    # arka planda çekilir; bu sırada yorumlar ve favori durumu veritabanından okunur
+    language = tmdb_client.TMDB_LANGUAGE
+    movie_info = fragment_cache.get_movie_info(movie_id, language)
+    movie_future = get_movie_page_async(movie_id) if movie_info is None else None
 
-    cursor.execute("SELECT 1 FROM Favorites WHERE UserId = ? AND MovieId = ?", (session["user_id"], movie_id))
-    is_favorite = cursor.fetchone() is not None
-    conn.close()
+    comments_page = max(request.args.get("comments_page", 1, type=int), 1)
+    comments_fragment = fragment_cache.comments(movie_id, comments_page,
+                                                lambda: render_comments(movie_id, comments_page))
+    is_favorite = favorite_store.is_favorite(session["user_id"], movie_id)
 
-    return render_template("movie_detail.html", movie=movie, comments=comments, is_favorite=is_favorite)
+    if movie_future is not None:
+        try:
+            movie, platforms = movie_future.result()
+        except resilience.UpstreamError as e:
+            print("❌ Film bilgisi alınamadı:", e)
+            flash("Film bilgileri şu an alınamıyor, lütfen biraz sonra tekrar deneyin.", "danger")
+            return redirect(url_for("recommend"))
+        if not movie:
+            flash("Film bulunamad\u0131!", "danger")
+            return redirect(url_for("recommend"))
+        movie_info = fragment_cache.make_fragment(
+            render_template("_movie_info.html", movie=movie, platforms=platforms))
+        fragment_cache.set_movie_info(movie_id, language, movie_info)
+
+    # Sayfa kullanıcıya özel (favori durumu, kullanıcı adı) olduğu için ETag bunları da içerir.
+    # Gösterilecek flash mesajı varsa sayfa her zaman yeniden işlenir.
+    etag = hashlib.sha1(
+        f"{session['user_id']}:{session.get('username')}:{is_favorite}:{movie_info.etag}:{comments_fragment.etag}".encode()
+    ).hexdigest()
+    if request.method == "GET" and not session.get("_flashes") and etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = make_response(render_template(
+            "movie_detail.html", movie_id=movie_id, movie_info=movie_info.html,
+            comments_html=comments_fragment.html, is_favorite=is_favorite))
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+def render_comments(movie_id, comments_page):
+    comments, has_more_comments = comment_store.get_page(movie_id, comments_page, COMMENTS_PAGE_SIZE)
+    return fragment_cache.make_fragment(render_template(
+        "_movie_comments.html", movie_id=movie_id, comments=comments, comments_page=comments_page,
+        has_more_comments=has_more_comments))
+
+@app.template_global()
+def poster_url(poster_path, size):
+    """Şablonlarda afiş adresi: TMDb yerine yerel vekil (/poster) kullanılır."""
+    if not poster_path:
+        return ""
+    return url_for("poster", size=size, filename=poster_path.lstrip("/"))
+
+@app.route("/poster/<size>/<filename>")
+def poster(size, filename):
+    if not poster_cache.is_valid(size, filename):
+        abort(404)
+
+    # Afiş yolu değişmeden içerik değişmez; tarayıcıda olan afiş için diske ya da TMDb'ye gidilmez
+    etag = poster_cache.etag(size, filename)
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        try:
+            data = poster_cache.get(size, filename)
+        except Exception as e:
+            print("❌ Afiş indirilemedi:", e)
+            abort(502)
+        if data is None:
+            abort(404)
+        response = Response(data, mimetype=poster_cache.content_type(filename))
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = poster_cache.POSTER_MAX_AGE
+    response.cache_control.immutable = True
+    return response
 
 @app.route("/favorite/<int:movie_id>", methods=["POST"])
 def add_favorite(movie_id):
     if "user_id" not in session:
         return redirect(url_for("login"))
 
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT 1 FROM Favorites WHERE UserId = ? AND MovieId = ?", (session["user_id"], movie_id))
-    exists = cursor.fetchone()
-    if not exists:
-        cursor.execute("INSERT INTO Favorites (UserId, MovieId) VALUES (?, ?)", (session["user_id"], movie_id))
-        conn.commit()
+    if favorite_store.add(session["user_id"], movie_id):
         flash("Favorilere eklendi!", "success")
     else:
         flash("Bu film zaten favorilerinde.", "info")
-    conn.close()
     return redirect(request.referrer or url_for("recommend"))
 
 @app.route("/favorites")
@@ -239,13 +300,10 @@ def favorites():
     if "user_id" not in session:
         return redirect(url_for("login"))
 
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT MovieId FROM Favorites WHERE UserId = ?", (session["user_id"],))
-    favorite_ids = [row.MovieId for row in cursor.fetchall()]
-    conn.close()
+    favorite_ids = favorite_store.movie_ids(session["user_id"])
 
-    favorite_movies = [get_movie_details(movie_id) for movie_id in favorite_ids]
+    # Detaylar tek tek sırayla değil, paralel olarak çekilir
+    favorite_movies = get_movie_details_many(favorite_ids)
     return render_template("favorites.html", movies=favorite_movies)
 
 @app.route("/remove_favorite/<int:movie_id>", methods=["POST"])
@@ -253,11 +311,7 @@ def remove_favorite(movie_id):
     if "user_id" not in session:
         return redirect(url_for("login"))
 
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM Favorites WHERE UserId = ? AND MovieId = ?", (session["user_id"], movie_id))
-    conn.commit()
-    conn.close()
+    favorite_store.remove(session["user_id"], movie_id)
     flash("Favorilerden kald\u0131r\u0131ld\u0131.", "success")
     return redirect(url_for("favorites"))
 
@@ -266,28 +320,14 @@ def history():
     if "user_id" not in session:
         return redirect(url_for("login"))
 
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT QuestionText, RecommendedMovie, RecommendedMovieId, Timestamp
-        FROM Recommendations
-        WHERE UserId = ?
-        ORDER BY Timestamp DESC
-    """, (session["user_id"],))
-    rows = cursor.fetchall()
-    conn.close()
-
-    grouped_data = defaultdict(list)
-    for row in rows:
-        question = row[0]
-        movie = {
-            "title": row[1],
-            "id": row[2],
-            "timestamp": row[3]
-        }
-        grouped_data[question].append(movie)
-
-    return render_template("history.html", grouped_data=grouped_data)
+    page = HistoryPage(session["user_id"], before=request.args.get("before"))
+
+    # ?stream=1: ilk gruplar sorgu bitmeden tarayıcıya gönderilir
+    if request.args.get("stream") == "1" or HISTORY_STREAM:
+        return Response(stream_template("history.html", page=page, groups=iter(page)))
+
+    groups = list(page)
+    return render_template("history.html", page=page, groups=groups)
 @app.route("/forgot-password", methods=["GET", "POST"])
 def forgot_password():
     if request.method == "POST":
@@ -295,11 +335,10 @@ def forgot_password():
 
         if step == "send_code":
             email = request.form["email"]
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT Id FROM Users WHERE Email = ?", (email,))
-            user = cursor.fetchone()
-            conn.close()
+            with get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT Id FROM Users WHERE Email = ?", (email,))
+                user = cursor.fetchone()
 
             if user:
                 code = str(random.randint(100000, 999999))
@@ -321,12 +360,15 @@ def forgot_password():
 
         elif step == "reset_password":
             new_password = request.form["new_password"]
-            password_hash = bcrypt.generate_password_hash(new_password).decode("utf-8")
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("UPDATE Users SET PasswordHash = ? WHERE Email = ?", (password_hash, session["reset_email"]))
-            conn.commit()
-            conn.close()
+            try:
+                password_hash = password_hasher.hash_password(new_password)
+            except HasherBusy:
+                flash(BUSY_MESSAGE, "danger")
+                return render_template("forgot_password.html"), 503
+            with get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("UPDATE Users SET PasswordHash = ? WHERE Email = ?", (password_hash, session["reset_email"]))
+                conn.commit()
             session.pop("reset_email", None)
             session.pop("reset_code", None)
             session.pop("step", None)
@@ -335,6 +377,22 @@ def forgot_password():
 
     return render_template("forgot_password.html")
 
+def warm_up():
+    """
+    Ağır modülleri ve tek seferlik hazırlıkları önceden yükler; normalde hepsi ilk kullanımda yapılır.
+    Pre-fork sunucularda (ör. gunicorn --preload) ana süreçte çağrılırsa işçiler bunları
+    hazır devralır. İş parçacığı veya süreç başlatmaz, bu yüzden fork öncesinde güvenlidir.
+    """
+    import catalog
+    llm_analyzer.get_model()  # google.generativeai içe aktarılır ve model nesnesi kurulur
+    tmdb_client.get_session()
+    catalog.get_catalog()
+    password_hasher.hasher.rounds  # bcrypt maliyeti otomatikse burada ölçülür
+    print("🔥 Uygulama ön ısıtması tamamlandı")
+
+if os.getenv("APP_WARMUP", "0") == "1":
+    warm_up()
+
 if __name__ == "__main__":
     print("🚀 Flask çalıştırılıyor...")
     app.run(debug=True)
@@ -0,0 +1,87 @@
+"""
+Analiz hattının aşama bazında doğruluk ve gecikmesini ölçer.
+Etiketli değerlendirme seti: benchmarks/mood_eval.jsonl
+
+Çalıştırma: python -m benchmarks.bench_analyzer [--threshold 0.6] [--with-llm]
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+EVAL_PATH = os.path.join(os.path.dirname(__file__), "mood_eval.jsonl")
+
+
+def load_eval_set(path=EVAL_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def score(predicted, expected):
+    """İlk tahmin edilen tür etiketlerde var mı (top-1 isabet)."""
+    return bool(predicted) and predicted[0] in expected
+
+
+def precision(predicted, expected):
+    """Tahmin edilen türlerin etiketlerde olan oranı (discover tüm türleri birlikte istediği için fazlası zararlı)."""
+    return sum(genre in expected for genre in predicted) / len(predicted)
+
+
+def run_stage(name, stage, samples):
+    hits, latencies, answered = 0, [], 0
+    precisions = []
+    for sample in samples:
+        start = time.perf_counter()
+        result = stage(sample["text"])
+        latencies.append((time.perf_counter() - start) * 1000)
+        if result is None:
+            continue
+        answered += 1
+        hits += score(result.get("turler", []), sample["turler"])
+        if result.get("turler"):
+            precisions.append(precision(result["turler"], sample["turler"]))
+    return {
+        "stage": name,
+        "answered": answered,
+        "accuracy": hits / answered if answered else 0.0,
+        "precision": statistics.mean(precisions) if precisions else 0.0,
+        "p50_ms": statistics.median(latencies),
+        "max_ms": max(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threshold", type=float, default=None, help="sözlük güven eşiği")
+    parser.add_argument("--with-llm", action="store_true", help="Gemini aşamasını da ölç (API anahtarı gerekir)")
+    args = parser.parse_args()
+
+    import llm_analyzer
+    import mood_lexicon
+
+    if args.threshold is not None:
+        llm_analyzer.LEXICON_CONFIDENCE_THRESHOLD = args.threshold
+
+    samples = load_eval_set()
+    results = [
+        # Eşik uygulanmadan: sözlüğün tek başına doğruluğu
+        run_stage("lexicon (eşiksiz)", lambda text: mood_lexicon.classify(text), samples),
+        # Eşikle: hızlı yolun gerçekten cevapladığı istekler
+        run_stage("lexicon (hızlı yol)", llm_analyzer.lexicon_stage, samples),
+    ]
+    if args.with_llm:
+        results.append(run_stage("gemini", llm_analyzer.gemini_stage, samples))
+
+    print(f"Örnek sayısı: {len(samples)}, eşik: {llm_analyzer.LEXICON_CONFIDENCE_THRESHOLD}")
+    print(f"{'aşama':<22} {'cevap':>6} {'doğruluk':>9} {'kesinlik':>9} {'p50 (ms)':>9} {'max (ms)':>9}")
+    for r in results:
+        print(f"{r['stage']:<22} {r['answered']:>6} {r['accuracy']:>9.2%} {r['precision']:>9.2%} "
+              f"{r['p50_ms']:>9.3f} {r['max_ms']:>9.3f}")
+
+    fast = results[1]
+    print(f"\nHızlı yolun üstlendiği oran (LLM'e gitmeyen istekler): {fast['answered'] / len(samples):.0%}")
+
+
+if __name__ == "__main__":
+    main()
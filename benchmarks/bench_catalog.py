@@ -0,0 +1,71 @@
+"""
+Yerel katalogda arama hızını ölçer (varsayılan 100.000 sentetik film).
+
+Çalıştırma: python -m benchmarks.bench_catalog [--size 100000] [--queries 1000]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from catalog import Catalog
+from benchmarks.stub_tmdb import GENRE_IDS
+
+VOCABULARY = [
+    "aşk", "savaş", "uzay", "hazine", "aile", "dostluk", "intikam", "yolculuk", "hayalet", "robot",
+    "gelecek", "polis", "soygun", "okul", "ada", "orman", "kral", "ejderha", "hüzün", "kahkaha",
+    "dedektif", "cinayet", "müzik", "dans", "futbol", "deniz", "gezegen", "zaman", "sır", "köy",
+]
+
+
+def synthetic_movies(size, seed=42):
+    rnd = random.Random(seed)
+    return [
+        {
+            "id": movie_id,
+            "title": f"Film {movie_id}",
+            "overview": " ".join(rnd.choices(VOCABULARY, k=12)),
+            "poster_path": f"/poster{movie_id}.jpg",
+            "release_date": "2000-01-01",
+            "vote_average": round(rnd.uniform(3, 9), 1),
+            "popularity": rnd.expovariate(1 / 30),
+            "genre_ids": rnd.sample(GENRE_IDS, rnd.randint(1, 3)),
+        }
+        for movie_id in range(1, size + 1)
+    ]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    movies = synthetic_movies(args.size)
+    start = time.perf_counter()
+    catalog = Catalog(movies)
+    build_s = time.perf_counter() - start
+    print(f"Katalog: {len(catalog)} film, indeks oluşturma {build_s:.2f} s, "
+          f"{len(catalog.term_index)} terim, {len(catalog.genre_index)} tür")
+
+    rnd = random.Random(7)
+    latencies = []
+    for _ in range(args.queries):
+        genres = rnd.sample(GENRE_IDS, rnd.randint(1, 3))
+        keywords = rnd.sample(VOCABULARY, rnd.randint(0, 3))
+        start = time.perf_counter()
+        results = catalog.search(genres, keywords)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert len(results) == 20
+
+    print(f"Arama ({args.queries} sorgu): p50 {statistics.median(latencies):.2f} ms, "
+          f"p95 {percentile(latencies, 0.95):.2f} ms, p99 {percentile(latencies, 0.99):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
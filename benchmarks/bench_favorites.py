@@ -0,0 +1,51 @@
+"""
+/favorites sayfasının TMDb maliyetini ölçer: eski sıralı requests.get döngüsü ile
+havuzlu oturum + paralel get_movie_details_many karşılaştırılır.
+
+Çalıştırma: python -m benchmarks.bench_favorites [--latency 0.05]
+"""
+import argparse
+import os
+import time
+
+import requests
+
+from benchmarks.stub_tmdb import StubTMDbServer
+
+
+def serial_baseline(base_url, movie_ids):
+    # Eski davranış: her film için yeni bağlantı ile sırayla istek
+    return [requests.get(f"{base_url}/movie/{movie_id}", params={"language": "tr-TR"}).json()
+            for movie_id in movie_ids]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.05, help="taklit sunucu gecikmesi (saniye)")
+    parser.add_argument("--sizes", default="1,10,50,100,200", help="favori sayıları")
+    args = parser.parse_args()
+
+    with StubTMDbServer(latency=args.latency) as server:
+        # tmdb_client TMDB_BASE_URL'i import sırasında okur
+        os.environ["TMDB_BASE_URL"] = server.base_url
+        import tmdb_client
+
+        print(f"{'favori':>7} {'sıralı (ms)':>12} {'paralel (ms)':>13} {'hızlanma':>9}")
+        for size in [int(s) for s in args.sizes.split(",")]:
+            movie_ids = list(range(1, size + 1))
+
+            start = time.perf_counter()
+            serial_baseline(server.base_url, movie_ids)
+            serial_ms = (time.perf_counter() - start) * 1000
+
+            tmdb_client.clear_cache()
+            start = time.perf_counter()
+            movies = tmdb_client.get_movie_details_many(movie_ids)
+            batch_ms = (time.perf_counter() - start) * 1000
+            assert [m["id"] for m in movies] == movie_ids
+
+            print(f"{size:>7} {serial_ms:>12.1f} {batch_ms:>13.1f} {serial_ms / batch_ms:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
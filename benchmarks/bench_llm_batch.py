@@ -0,0 +1,90 @@
+"""
+Gemini mikro-toplama ayarlarının ölçümü.
+Sahte Gemini modeline saniyede --rate analiz isteği (Poisson varışlı) gönderilir ve her
+pencere / parti boyutu ayarı için model çağrı sayısı, ortalama parti boyutu, tekil çağrıya
+düşen girdi sayısı ve istek gecikmesi (p50/p95) raporlanır. İlk satır toplama kapalıyken
+(her girdi için ayrı çağrı) ölçülür.
+
+Çalıştırma: python -m benchmarks.bench_llm_batch [--rate 30] [--duration 10]
+"""
+import argparse
+import random
+import threading
+import time
+
+import llm_analyzer
+from benchmarks.bench_analyzer import load_eval_set
+from benchmarks.fake_gemini import FakeGeminiModel
+from llm_batcher import MicroBatcher
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+def run(texts, rate, duration, seed):
+    rnd = random.Random(seed)
+    latencies = []
+    lock = threading.Lock()
+
+    def request(text):
+        start = time.perf_counter()
+        llm_analyzer.gemini_stage(text)
+        with lock:
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = []
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        thread = threading.Thread(target=request, args=(rnd.choice(texts),))
+        thread.start()
+        threads.append(thread)
+        time.sleep(rnd.expovariate(rate))
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rate", type=float, default=30, help="saniyedeki analiz isteği")
+    parser.add_argument("--duration", type=float, default=10, help="her ayar için süre (saniye)")
+    parser.add_argument("--windows", default="10,25,50,100", help="pencere süreleri (ms)")
+    parser.add_argument("--sizes", default="4,16", help="en fazla parti boyutları")
+    parser.add_argument("--concurrency", type=int, default=llm_analyzer.LLM_BATCH_CONCURRENCY,
+                        help="aynı anda işlenen en fazla parti (hız sınırı)")
+    parser.add_argument("--llm-latency", type=float, default=0.8)
+    parser.add_argument("--per-item-latency", type=float, default=0.02)
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="bozuk parti yanıtı oranı (tekil çağrıya düşüşü ölçmek için)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    texts = [sample["text"] for sample in load_eval_set()]
+    configs = [(0, 1)] + [(int(w), int(s)) for w in args.windows.split(",") for s in args.sizes.split(",")]
+
+    print(f"İstek hızı: {args.rate}/s  süre: {args.duration} s  model gecikmesi: {args.llm_latency} s")
+    print(f"{'pencere ms':>10} {'parti':>6} {'istek':>6} {'çağrı':>6} {'ort. parti':>10} "
+          f"{'tekile düşen':>12} {'p50 ms':>8} {'p95 ms':>8}")
+    for window_ms, max_batch in configs:
+        model = FakeGeminiModel(latency=args.llm_latency, per_item_latency=args.per_item_latency,
+                                malformed_rate=args.malformed_rate)
+        llm_analyzer.set_model(model)
+        batcher = None
+        if window_ms:
+            batcher = MicroBatcher(llm_analyzer._analyze_batch_with_gemini, window=window_ms / 1000,
+                                   max_batch=max_batch, concurrency=args.concurrency)
+        llm_analyzer.batcher = batcher
+
+        latencies = run(texts, args.rate, args.duration, args.seed)
+        stats = batcher.stats() if batcher else {"batches": 0, "items": 0, "failed_items": 0}
+        mean_batch = stats["items"] / stats["batches"] if stats["batches"] else 1.0
+        label = "kapalı" if not window_ms else str(window_ms)
+        print(f"{label:>10} {max_batch:>6} {len(latencies):>6} {model.calls:>6} {mean_batch:>10.1f} "
+              f"{stats['failed_items']:>12} {percentile(latencies, 0.5):>8.0f} {percentile(latencies, 0.95):>8.0f}")
+    llm_analyzer.batcher = None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Giriş (bcrypt doğrulama) verimini çekirdek sayısına göre ölçer.
+Aynı anda çok sayıda giriş isteği gönderilir; her süreç sayısı için saniyedeki doğrulama sayısı ve
+doğrulama gecikmesi raporlanır. Karşılaştırma için ilk satır eski davranıştır: doğrulama isteği
+işleyen iş parçacığında yapılır (workers=0).
+
+Ayrıca yoğunluk sırasında hafif bir işin (ör. başka bir rotanın) ne kadar geciktiği ölçülür.
+
+Çalıştırma: python -m benchmarks.bench_password [--rounds 10] [--logins 200]
+"""
+import argparse
+import os
+import threading
+import time
+
+from password_hasher import PasswordHasher, _hash
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+def light_task_latency(stop):
+    # GIL/CPU açlığını görmek için kısa bir Python işi tekrar tekrar çalıştırılır
+    samples = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        sum(range(20000))
+        samples.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.005)
+    return samples
+
+
+def run(hasher, password_hash, logins, concurrency):
+    latencies = []
+    lock = threading.Lock()
+    remaining = iter(range(logins))
+
+    def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            assert hasher.check_password(password_hash, "sifre123")
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    light_samples = []
+    stop = threading.Event()
+    light = threading.Thread(target=lambda: light_samples.extend(light_task_latency(stop)))
+    light.start()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    stop.set()
+    light.join()
+    return logins / wall, latencies, light_samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt maliyeti")
+    parser.add_argument("--logins", type=int, default=200, help="her ölçümdeki giriş sayısı")
+    parser.add_argument("--concurrency", type=int, default=32, help="eşzamanlı giriş isteği")
+    parser.add_argument("--workers", help="virgülle ayrılmış süreç sayıları (varsayılan 1,2,4,..,çekirdek sayısı)")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    if args.workers:
+        worker_counts = [int(w) for w in args.workers.split(",")]
+    else:
+        worker_counts = sorted({min(2 ** i, cores) for i in range(cores.bit_length() + 1)})
+
+    password_hash = _hash("sifre123", args.rounds)
+    print(f"Çekirdek: {cores}  maliyet: {args.rounds}  giriş: {args.logins}  eşzamanlı: {args.concurrency}")
+    print(f"{'süreç':>7} {'giriş/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'hafif iş p95 ms':>16}")
+    for workers in [0] + worker_counts:
+        hasher = PasswordHasher(workers=workers, max_pending=args.concurrency, rounds=args.rounds)
+        if workers:
+            # Süreç başlatma maliyeti ölçüme karışmasın
+            for _ in range(workers):
+                hasher.check_password(password_hash, "sifre123")
+        throughput, latencies, light = run(hasher, password_hash, args.logins, args.concurrency)
+        hasher.shutdown()
+        label = "satır içi" if workers == 0 else str(workers)
+        print(f"{label:>7} {throughput:>9.1f} {percentile(latencies, 0.5):>8.1f} "
+              f"{percentile(latencies, 0.95):>8.1f} {percentile(light, 0.95):>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
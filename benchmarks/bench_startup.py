@@ -0,0 +1,100 @@
+"""
+Uygulama açılış maliyeti ölçümü.
+app modülü ayrı bir Python sürecinde `python -X importtime` ile içe aktarılır; içe aktarma süresi
+ve sürecin bellek kullanımı (en yüksek RSS) birkaç tekrarın ortancası olarak raporlanır.
+En yavaş modüller listelenir. Sonuç bütçeyi aşarsa betik hata koduyla çıkar; böylece ağır bir
+bağımlılığın yeniden modül seviyesinde içe aktarılması fark edilir.
+
+Çalıştırma: python -m benchmarks.bench_startup [--budget-ms 350] [--budget-mb 60]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Alt süreçte çalışan kod: app'i içe aktarır ve en yüksek RSS'yi (MB) yazdırır
+CHILD_CODE = """
+import app
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print("RSS_MB", rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024)
+except ImportError:
+    print("RSS_MB", 0)
+"""
+
+# Açılışta yüklenmemesi gereken ağır bağımlılıklar (ilk kullanımda yüklenir)
+LAZY_MODULES = ["google.generativeai", "requests", "numpy", "pyodbc", "smtplib"]
+
+
+def parse_importtime(stderr):
+    """-X importtime çıktısından {modül: (kendi süresi µs, toplam süre µs)}"""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|").split("|")]
+        timings[name] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def measure_once(env):
+    check = "; ".join(f"print('LOADED', '{name}', '{name}' in sys.modules)" for name in LAZY_MODULES)
+    code = "import sys" + CHILD_CODE + check
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=PROJECT_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    timings = parse_importtime(result.stderr)
+    rss_mb = 0.0
+    loaded = []
+    for line in result.stdout.splitlines():
+        if line.startswith("RSS_MB"):
+            rss_mb = float(line.split()[1])
+        elif line.startswith("LOADED") and line.endswith("True"):
+            loaded.append(line.split()[1])
+    return timings, rss_mb, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=350, help="app içe aktarma süresi bütçesi")
+    parser.add_argument("--budget-mb", type=float, default=60, help="en yüksek RSS bütçesi")
+    parser.add_argument("--top", type=int, default=10, help="listelenecek en yavaş modül sayısı")
+    args = parser.parse_args()
+
+    env = dict(os.environ, APP_WARMUP="0", PYTHONDONTWRITEBYTECODE="1")
+    import_ms, rss = [], []
+    for _ in range(args.runs):
+        timings, rss_mb, loaded = measure_once(env)
+        import_ms.append(timings["app"][1] / 1000)
+        rss.append(rss_mb)
+
+    median_ms = statistics.median(import_ms)
+    median_mb = statistics.median(rss)
+    print(f"app içe aktarma: {median_ms:.0f} ms (ortanca, {args.runs} tekrar; bütçe {args.budget_ms:.0f} ms)")
+    print(f"en yüksek RSS:   {median_mb:.1f} MB (bütçe {args.budget_mb:.0f} MB)")
+    print("\nEn yavaş modüller (kendi süresi):")
+    for name, (self_us, cumulative_us) in sorted(timings.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"  {self_us / 1000:>7.1f} ms  (toplam {cumulative_us / 1000:>7.1f} ms)  {name}")
+
+    failures = []
+    if median_ms > args.budget_ms:
+        failures.append(f"içe aktarma süresi bütçeyi aştı: {median_ms:.0f} ms > {args.budget_ms:.0f} ms")
+    if median_mb > args.budget_mb:
+        failures.append(f"bellek bütçeyi aştı: {median_mb:.1f} MB > {args.budget_mb:.0f} MB")
+    if loaded:
+        failures.append(f"açılışta yüklenmemesi gereken modüller yüklendi: {', '.join(loaded)}")
+
+    print()
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Açılış bütçe içinde")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
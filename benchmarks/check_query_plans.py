@@ -0,0 +1,97 @@
+"""
+Sorgu planı kontrolü.
+Uygulamanın sıcak sorguları geçici bir SQLite veritabanında EXPLAIN QUERY PLAN ile çalıştırılır ve
+her birinin beklenen indeksi kullandığı, tabloyu baştan sona taramadığı ve (gereken yerlerde)
+sıralama için geçici B-ağacı kurmadığı doğrulanır. Bir indeks silinir veya bir sorgu indeksle
+uyumsuz hale gelirse betik hata koduyla çıkar.
+
+SQL Server'daki INCLUDE'lu kapsayan indeksler bu kontrolün dışındadır; orada aynı sorguların
+gerçek planı SSMS'te "Include Actual Execution Plan" ile incelenebilir.
+
+Çalıştırma: python -m benchmarks.check_query_plans
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="moodflix-plan-"), "plan.db")
+
+import comments  # noqa: E402
+import favorites  # noqa: E402
+import taste_profile  # noqa: E402
+from db import get_connection  # noqa: E402
+from recommendation_log import HistoryPage, encode_cursor  # noqa: E402
+
+
+TABLES = ("Users", "Recommendations", "Favorites", "Comments", "UserTasteProfiles")
+
+
+def checks():
+    """(ad, SQL, parametreler, beklenen indeks, planda bulunmaması gereken ifadeler)"""
+    first_page = HistoryPage(1)
+    older_page = HistoryPage(1, before=encode_cursor(datetime(2024, 1, 1), 100))
+    comments_sql, comments_params = comments.page_query(1, 3, 20)
+    no_sort = ["USE TEMP B-TREE"]
+    return [
+        ("geçmiş (ilk sayfa)", *first_page._query(), "IX_Recommendations_UserId_Timestamp", []),
+        ("geçmiş (keyset)", *older_page._query(), "IX_Recommendations_UserId_Timestamp", []),
+        ("zevk profili soruları", taste_profile.QUESTIONS_SQL, (1,), "IX_Recommendations_UserId_Timestamp", []),
+        ("yorum sayfası", comments_sql, comments_params, "IX_Comments_MovieId_CreatedAt", no_sort),
+        ("favori listesi", favorites.MOVIE_IDS_SQL, (1,), "UX_Favorites_UserId_MovieId", []),
+        ("favori silme", favorites.REMOVE_SQL, (1, 1), "UX_Favorites_UserId_MovieId", []),
+    ]
+
+
+def explain(conn, sql, params):
+    cursor = conn.cursor()
+    cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+    return [row[3] for row in cursor.fetchall()]
+
+
+def check_upsert():
+    # Tek ifadelik upsert gerçekten benzersiz indekse dayanıyor mu?
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO Users (Username, Email, PasswordHash) VALUES ('plan', 'plan@example.com', 'x')")
+        user_id = cursor.lastrowid
+        conn.commit()
+    # İkinci ekleme bellekteki kümeye değil veritabanındaki benzersiz indekse çarpmalı
+    first = favorites.add(user_id, 42)
+    favorites.invalidate(user_id)
+    results = [first, favorites.add(user_id, 42)]
+    return results == [True, False]
+
+
+def main():
+    failures = 0
+    with get_connection() as conn:
+        for name, sql, params, index, forbidden in checks():
+            plan = explain(conn, sql, params)
+            problems = []
+            if not any(index in line for line in plan):
+                problems.append(f"{index} kullanılmıyor")
+            for line in plan:
+                # Alt sorgu / CO-ROUTINE sonuçlarının taranması sorun değil, tabloların taranması sorun
+                if line.split(" ")[:2] in (["SCAN", table] for table in TABLES):
+                    problems.append(f"tam tarama: {line}")
+                problems += [f"istenmeyen adım: {line}" for bad in forbidden if bad in line]
+
+            status = "✅" if not problems else "❌"
+            print(f"{status} {name}")
+            for line in plan:
+                print(f"      {line}")
+            for problem in problems:
+                print(f"   -> {problem}")
+            failures += bool(problems)
+
+    upsert_ok = check_upsert()
+    print(f"{'✅' if upsert_ok else '❌'} favori ekleme tek ifadelik upsert (ikinci ekleme yok sayılır)")
+    failures += not upsert_ok
+
+    print(f"\n{failures} sorun bulundu" if failures else "\nTüm sorgular beklenen indeksleri kullanıyor")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
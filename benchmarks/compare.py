@@ -0,0 +1,41 @@
+"""
+İki yük testi sonucunu (benchmarks/load_test.py çıktısı) rota bazında karşılaştırır.
+
+Çalıştırma: python -m benchmarks.compare eski.json yeni.json
+"""
+import argparse
+import json
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def change(old, new):
+    if not old:
+        return "   -"
+    return f"{(new - old) / old:+.0%}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+
+    print(f"{baseline['revision']} -> {candidate['revision']}")
+    print(f"{'rota':<14}" + "".join(f"{metric:>24}" for metric in METRICS))
+    for route, new in candidate["routes"].items():
+        old = baseline["routes"].get(route, {})
+        cells = [
+            f"{old.get(metric, 0):>9} -> {new[metric]:<7} {change(old.get(metric), new[metric]):>5}"
+            for metric in METRICS
+        ]
+        print(f"{route:<14}" + "".join(f"{cell:>24}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark'lar için sahte Gemini modeli.
+generate_content() gerçek API yerine ayarlanabilir bir gecikmeden sonra sözlük sınıflandırıcısının
+sonucunu Gemini'nin döndürdüğü biçimde (kod bloğu içinde JSON) döndürür. Parti istemlerinde
+("Girdiler: [...]") her girdi için bir nesne içeren JSON dizisi döner.
+"""
+import json
+import random
+import re
+import time
+
+import mood_lexicon
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """
+    :param latency: her çağrıda beklenecek süre (saniye)
+    :param error_rate: 0-1 arası; bu oranda çağrı hata fırlatır
+    :param per_item_latency: parti istemlerinde girdi başına eklenen süre (saniye)
+    :param malformed_rate: 0-1 arası; bu oranda parti yanıtı bozuk JSON olarak döner
+    """
+
+    def __init__(self, latency=0.8, error_rate=0.0, per_item_latency=0.02, malformed_rate=0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.per_item_latency = per_item_latency
+        self.malformed_rate = malformed_rate
+        self.calls = 0
+        self.batch_calls = 0
+
+    def generate_content(self, prompt, request_options=None):
+        self.calls += 1
+        batch = re.search(r"Girdiler: (\[.*\])", prompt)
+        inputs = json.loads(batch.group(1)) if batch else None
+        if inputs is not None:
+            self.batch_calls += 1
+
+        delay = self.latency + (self.per_item_latency * len(inputs) if inputs else 0)
+        # Gerçek istemci gibi request_options'taki zaman aşımına uyar
+        timeout = (request_options or {}).get("timeout")
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("fake gemini timeout")
+        if delay:
+            time.sleep(delay)
+        if self.error_rate and random.random() < self.error_rate:
+            raise RuntimeError("fake gemini error")
+
+        if inputs is None:
+            match = re.search(r"'(.*?)'\.", prompt, re.S)
+            payload = self._analyze(match.group(1) if match else prompt)
+        elif self.malformed_rate and random.random() < self.malformed_rate:
+            return FakeResponse("```json\n[{\"turler\": [\"Dram\"], \n```")
+        else:
+            payload = [self._analyze(text) for text in inputs]
+        return FakeResponse("```json\n" + json.dumps(payload, ensure_ascii=False) + "\n```")
+
+    def _analyze(self, text):
+        result = mood_lexicon.classify(text)
+        if not result["turler"]:
+            result["turler"] = ["Dram"]
+        return {"turler": result["turler"], "anahtar_kelimeler": result["anahtar_kelimeler"]}
@@ -0,0 +1,220 @@
+"""
+Uçtan uca yük testi.
+Uygulama gerçek TMDb, Gemini ve SQL Server yerine yerel taklitlerle çalıştırılır:
+- taklit TMDb HTTP sunucusu (benchmarks/stub_tmdb.py, gecikme ve hata oranı ayarlanabilir)
+- sahte Gemini modeli (benchmarks/fake_gemini.py)
+- geçici bir SQLite veritabanı
+
+Sanal kullanıcılar kayıt olup giriş yapar, ardından /recommend, /movie/<id>, /favorites ve
+/history rotalarına karışık istek gönderir. Rota başına verim ve p50/p95/p99 gecikme raporlanır;
+sonuçlar karşılaştırma için JSON dosyasına yazılır (bkz. benchmarks/compare.py).
+
+Çalıştırma: python -m benchmarks.load_test --users 20 --duration 30
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+from benchmarks.bench_analyzer import load_eval_set
+from benchmarks.stub_tmdb import StubTMDbServer
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# Rota karışımı (ağırlıklar)
+ROUTE_WEIGHTS = {
+    "/recommend": 3,
+    "/movie/<id>": 4,
+    "/favorites": 2,
+    "/history": 1,
+}
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def start_app(args, tmp_dir):
+    """Uygulamayı taklit servislerle yapılandırıp ayrı bir iş parçacığında HTTP sunucusu olarak başlatır."""
+    stub = StubTMDbServer(latency=args.tmdb_latency, error_rate=args.tmdb_error_rate).start()
+    os.environ["TMDB_BASE_URL"] = stub.base_url
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tmp_dir, "loadtest.db")
+    os.environ.setdefault("DB_POOL_SIZE", str(max(10, args.users)))
+    # Kurulumdaki kayıt/girişler ölçülmüyor; bcrypt maliyeti düşük tutulur (bkz. bench_password)
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    if args.llm_batch_window:
+        os.environ["LLM_BATCH_WINDOW_MS"] = str(args.llm_batch_window)
+        os.environ["LLM_BATCH_MAX_SIZE"] = str(args.llm_batch_size)
+
+    from werkzeug.serving import make_server
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    import llm_analyzer
+    from benchmarks.fake_gemini import FakeGeminiModel
+    model = FakeGeminiModel(latency=args.llm_latency, error_rate=args.llm_error_rate)
+    llm_analyzer.set_model(model)
+    if args.lexicon_threshold is not None:
+        llm_analyzer.LEXICON_CONFIDENCE_THRESHOLD = args.lexicon_threshold
+
+    from app import app
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return stub, server, model, f"http://127.0.0.1:{server.server_port}"
+
+
+class VirtualUser:
+    def __init__(self, base_url, index, moods, rnd):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.moods = moods
+        self.rnd = rnd
+        self.username = f"yuk{index}_{rnd.randint(0, 10 ** 9)}"
+
+    def setup(self, favorites):
+        data = {"username": self.username, "email": f"{self.username}@example.com", "password": "sifre123"}
+        self.session.post(f"{self.base_url}/register", data=data)
+        self.session.post(f"{self.base_url}/login", data=data)
+        for movie_id in self.rnd.sample(range(1, 5000), favorites):
+            self.session.post(f"{self.base_url}/favorite/{movie_id}")
+
+    def request(self, route):
+        if route == "/recommend":
+            return self.session.post(f"{self.base_url}/recommend", data={"user_input": self.rnd.choice(self.moods)})
+        if route == "/movie/<id>":
+            # Popüler filmler daha sık açılır (önbellek davranışı gerçekçi olsun)
+            movie_id = int(self.rnd.paretovariate(1.2)) % 2000 + 1
+            return self.session.get(f"{self.base_url}/movie/{movie_id}")
+        return self.session.get(f"{self.base_url}{route}")
+
+
+def run(args):
+    moods = [sample["text"] for sample in load_eval_set()]
+    tmp_dir = tempfile.mkdtemp(prefix="moodflix-load-")
+    stub, server, model, base_url = start_app(args, tmp_dir)
+
+    rnd = random.Random(args.seed)
+    users = [VirtualUser(base_url, i, moods, random.Random(rnd.random())) for i in range(args.users)]
+    for user in users:
+        user.setup(args.favorites)
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    routes = list(ROUTE_WEIGHTS)
+    weights = list(ROUTE_WEIGHTS.values())
+    deadline = time.monotonic() + args.duration
+
+    def worker(user):
+        while time.monotonic() < deadline:
+            route = user.rnd.choices(routes, weights)[0]
+            start = time.perf_counter()
+            try:
+                response = user.request(route)
+                ok = response.status_code < 500
+            except requests.RequestException:
+                ok = False
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies[route].append(elapsed)
+                if not ok:
+                    errors[route] += 1
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker, args=(user,)) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.monotonic() - started
+
+    server.shutdown()
+    stub.stop()
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "wall_seconds": round(wall, 3),
+        "llm_calls": model.calls,
+        "routes": {},
+    }
+    for route in routes:
+        values = latencies[route]
+        report["routes"][route] = {
+            "requests": len(values),
+            "errors": errors[route],
+            "throughput_rps": round(len(values) / wall, 2),
+            "p50_ms": round(percentile(values, 0.50), 2),
+            "p95_ms": round(percentile(values, 0.95), 2),
+            "p99_ms": round(percentile(values, 0.99), 2),
+        }
+    return report
+
+
+def print_report(report):
+    print(f"Revizyon: {report['revision']}  süre: {report['wall_seconds']} s  Gemini çağrısı: {report.get('llm_calls')}")
+    print(f"{'rota':<14} {'istek':>7} {'hata':>5} {'istek/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for route, r in report["routes"].items():
+        print(f"{route:<14} {r['requests']:>7} {r['errors']:>5} {r['throughput_rps']:>8} "
+              f"{r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MoodFlix uçtan uca yük testi")
+    parser.add_argument("--users", type=int, default=20, help="eşzamanlı sanal kullanıcı sayısı")
+    parser.add_argument("--duration", type=float, default=30, help="test süresi (saniye)")
+    parser.add_argument("--favorites", type=int, default=20, help="kullanıcı başına favori film sayısı")
+    parser.add_argument("--tmdb-latency", type=float, default=0.08)
+    parser.add_argument("--tmdb-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-latency", type=float, default=0.8)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-batch-window", type=float, default=0,
+                        help="Gemini mikro-toplama penceresi (ms); 0 ise kapalı")
+    parser.add_argument("--llm-batch-size", type=int, default=16, help="en fazla parti boyutu")
+    parser.add_argument("--lexicon-threshold", type=float, default=None,
+                        help="sözlük güven eşiği (ör. 2 verilirse tüm analizler sahte Gemini'ye gider)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="uygulamanın konsol çıktılarını göster")
+    parser.add_argument("--output", help="JSON sonuç dosyası (varsayılan benchmarks/results/<zaman>-<revizyon>.json)")
+    args = parser.parse_args()
+
+    if args.verbose:
+        report = run(args)
+    else:
+        # Uygulamanın print çıktıları raporu boğmasın
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = run(args)
+    print_report(report)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{report['revision'] or 'local'}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nSonuçlar yazıldı: {output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Benchmark'lar için yerel TMDb taklit sunucusu.
+Gerçek API'ye gitmeden gecikme ve hata oranı ayarlanabilir yanıtlar üretir.
+"""
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+GENRE_IDS = [28, 12, 16, 35, 80, 99, 18, 10751, 14, 36, 27, 10402, 9648, 10749, 878, 10770, 53, 10752, 37]
+
+
+def fake_movie(movie_id):
+    rnd = random.Random(movie_id)
+    genres = rnd.sample(GENRE_IDS, 2)
+    return {
+        "id": movie_id,
+        "title": f"Film {movie_id}",
+        "overview": f"Film {movie_id} için örnek açıklama.",
+        "poster_path": f"/poster{movie_id}.jpg",
+        "release_date": f"{rnd.randint(1970, 2024)}-01-01",
+        "vote_average": round(rnd.uniform(4, 9), 1),
+        "popularity": round(rnd.uniform(1, 500), 2),
+        "genre_ids": genres,
+        "genres": [{"id": g, "name": str(g)} for g in genres],
+        "runtime": rnd.randint(80, 180),
+        "credits": {"cast": [{"name": f"Oyuncu {i}"} for i in range(5)]},
+    }
+
+
+class StubTMDbServer:
+    """
+    Arka planda çalışan taklit TMDb sunucusu.
+    :param latency: her yanıt öncesi beklenecek süre (saniye)
+    :param error_rate: 0-1 arası; bu oranda istek 500 ile yanıtlanır
+    """
+
+    def __init__(self, latency=0.05, error_rate=0.0, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.request_count = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with server._lock:
+                    server.request_count += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if server.error_rate and random.random() < server.error_rate:
+                    return self._send(500, {"success": False, "status_message": "stub error"})
+                status, body = server.route(urlparse(self.path).path)
+                self._send(status, body)
+
+            def _send(self, status, body):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        ThreadingHTTPServer.request_queue_size = 128
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/3"
+
+    def route(self, path):
+        match = re.fullmatch(r"/3/movie/(\d+)/watch/providers", path)
+        if match:
+            return 200, {"id": int(match.group(1)), "results": {"TR": {"flatrate": [{"provider_name": "Netflix"}]}}}
+        match = re.fullmatch(r"/3/movie/(\d+)", path)
+        if match:
+            movie = fake_movie(int(match.group(1)))
+            movie["watch/providers"] = {"results": {"TR": {"flatrate": [{"provider_name": "Netflix"}]}}}
+            return 200, movie
+        if path == "/3/discover/movie":
+            return 200, {"page": 1, "results": [fake_movie(i) for i in random.sample(range(1, 100000), 20)]}
+        return 404, {"success": False, "status_code": 34}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,194 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Önbellekte bulunamayan anahtarlar için ayırt edici değer (None da geçerli bir değer olabilir)
+MISSING = object()
+
+
+class DiskStore:
+    """
+    Önbellek girdilerini yeniden başlatmalardan sonra da korumak için küçük bir SQLite deposu.
+    Değerler JSON olarak saklanır; bu yüzden sadece JSON'a çevrilebilen veriler yazılmalıdır.
+    Bellekteki LRU sınırı diske uygulanmaz; süresi (ve eski veri süresi) dolan girdiler ilk yazmada
+    ve sonra her purge_every yazmada bir silinir.
+    :param purge_every: kaç set() çağrısında bir süresi dolan girdilerin silineceği
+    """
+
+    def __init__(self, path, purge_every=1000):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.purge_every = purge_every
+        # Bu depoyu kullanan önbelleklerin en uzun stale_ttl'i; get_stale() için o kadar daha saklanır
+        self.retention = 0
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at ON cache_entries (expires_at)")
+        self._conn.commit()
+
+    def get(self, namespace, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        if row is None:
+            return MISSING, 0
+        return json.loads(row[0]), row[1]
+
+    def set(self, namespace, key, value, expires_at):
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, payload, expires_at),
+            )
+            self._conn.commit()
+            self._writes += 1
+            purge = (self._writes - 1) % self.purge_every == 0
+        if purge:
+            self.purge_expired()
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+            self._conn.commit()
+
+    def purge_expired(self, now=None):
+        """Süresi ve eski veri saklama süresi (retention) dolmuş tüm girdileri diskten siler."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?",
+                               ((now or time.time()) - self.retention,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TTLCache:
+    """
+    Süre sınırlı (TTL) ve boyut sınırlı (LRU) bellek içi önbellek.
+    İsteğe bağlı olarak bir DiskStore ile ikinci katman olarak desteklenir:
+    bellekte bulunamayan girdi diskte aranır, bulunursa belleğe geri yüklenir.
+
+    stale_ttl verilirse süresi dolan girdiler bu kadar daha saklanır; get() onları döndürmez ama
+    kaynağa ulaşılamadığında get_stale() ile eski veri kullanılabilir.
+    """
+
+    def __init__(self, name, maxsize=1024, default_ttl=3600, disk_store=None, stale_ttl=0):
+        self.name = name
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self.disk_store = disk_store
+        self.stale_ttl = stale_ttl
+        if disk_store is not None:
+            disk_store.retention = max(disk_store.retention, stale_ttl)
+        self._data = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+
+    def get(self, key):
+        """
+        Anahtarın değerini döndürür; yoksa veya süresi dolmuşsa MISSING döner.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                if expires_at + self.stale_ttl <= now:
+                    del self._data[key]
+                self.expirations += 1
+
+        if self.disk_store is not None:
+            value, expires_at = self.disk_store.get(self.name, key)
+            if value is not MISSING and expires_at > now:
+                with self._lock:
+                    self._store(key, value, expires_at)
+                    self.disk_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return MISSING
+
+    def get_stale(self, key):
+        """Süresi dolmuş olsa da stale_ttl içindeki değeri döndürür; yoksa MISSING."""
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None and self.disk_store is not None:
+            entry = self.disk_store.get(self.name, key)
+        if entry is None or entry[0] is MISSING or entry[1] + self.stale_ttl <= now:
+            return MISSING
+        with self._lock:
+            self.stale_hits += 1
+        return entry[0]
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._store(key, value, expires_at)
+        if self.disk_store is not None:
+            self.disk_store.set(self.name, key, value, expires_at)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+        if self.disk_store is not None:
+            self.disk_store.delete(self.name, key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def _store(self, key, value, expires_at):
+        # Kilit çağıran tarafından tutulmalı
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """İsabet / ıskalama / çıkarma sayaçlarını sözlük olarak döndürür."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "stale_hits": self.stale_hits,
+                "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
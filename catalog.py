@@ -0,0 +1,222 @@
+"""
+Yerel film kataloğu.
+TMDb discover sonuçları toplu olarak indirilip bir dosyada saklanır; öneriler ağa gitmeden
+bellekteki ters indeksler (tür ID'si ve açıklama/başlık kelimeleri) ve NumPy ile vektörel
+puanlama kullanılarak hesaplanır.
+
+Katalog güncelleme: python catalog.py --sync [--pages 100]
+"""
+import argparse
+import gzip
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from mood_lexicon import normalize_input
+
+CATALOG_PATH = os.getenv("CATALOG_PATH", "catalog.json.gz")
+# Dosya değişti mi diye en fazla bu sıklıkla bakılır (başka bir süreç --sync çalıştırdıysa yeniden yüklenir)
+RELOAD_CHECK_INTERVAL = 60
+
+# Puanlama ağırlıkları
+WEIGHTS = {
+    "genre": 3.0,
+    "keyword": 2.0,
+    "vote": 1.0,
+    "popularity": 1.0,
+}
+
+# Sadece bu alanlar saklanır (şablonların kullandığı alanlar + puanlama için gerekenler)
+FIELDS = ("id", "title", "overview", "poster_path", "release_date", "vote_average", "popularity", "genre_ids")
+
+STEM_LENGTH = 5
+STOPWORDS = {"bir", "ve", "ile", "için", "bu", "şu", "o", "da", "de", "ki", "gibi", "çok", "daha", "olan", "onun", "the", "and", "of"}
+
+
+def terms(text):
+    """Metni indekslenecek köklere ayırır (Türkçe ekleri kabaca atmak için ilk 5 harf)."""
+    return {
+        token[:STEM_LENGTH]
+        for token in normalize_input(text).split()
+        if len(token) >= 3 and not token.isdigit() and token not in STOPWORDS
+    }
+
+
+class Catalog:
+    def __init__(self, movies):
+        self.movies = [{field: movie.get(field) for field in FIELDS} for movie in movies]
+        n = len(self.movies)
+        self.ids = np.fromiter((m["id"] for m in self.movies), dtype=np.int64, count=n)
+        self.vote = np.fromiter((m["vote_average"] or 0 for m in self.movies), dtype=np.float32, count=n) / 10.0
+        popularity = np.log1p(np.fromiter((m["popularity"] or 0 for m in self.movies), dtype=np.float32, count=n))
+        self.popularity = popularity / popularity.max() if n and popularity.max() > 0 else popularity
+
+        genre_postings = {}
+        term_postings = {}
+        for row, movie in enumerate(self.movies):
+            for genre_id in movie["genre_ids"] or []:
+                genre_postings.setdefault(genre_id, []).append(row)
+            for term in terms(f"{movie['title'] or ''} {movie['overview'] or ''}"):
+                term_postings.setdefault(term, []).append(row)
+
+        self.genre_index = {key: np.array(rows, dtype=np.int32) for key, rows in genre_postings.items()}
+        self.term_index = {key: np.array(rows, dtype=np.int32) for key, rows in term_postings.items()}
+
+    def __len__(self):
+        return len(self.movies)
+
+    def search(self, genre_ids, keywords=None, limit=20):
+        """
+        Türler ve anahtar kelimelere göre en uygun filmleri döndürür.
+        :param genre_ids: TMDb tür ID'leri; verilirse en az bir türü tutan filmler aday olur
+        :param keywords: anahtar kelimeler (açıklama ve başlıkla eşleştirilir)
+        :return: filmler; tür istendiği halde hiçbiri katalogda yoksa boş liste (tür kısıtı düşürülmez)
+        """
+        n = len(self.movies)
+        if n == 0:
+            return []
+
+        genre_score = np.zeros(n, dtype=np.float32)
+        requested = bool(genre_ids)
+        genre_ids = [g for g in dict.fromkeys(genre_ids or []) if g in self.genre_index]
+        if requested and not genre_ids:
+            return []
+        for genre_id in genre_ids:
+            genre_score[self.genre_index[genre_id]] += 1.0
+        if genre_ids:
+            genre_score /= len(genre_ids)
+
+        keyword_score = np.zeros(n, dtype=np.float32)
+        query_terms = set()
+        for keyword in keywords or []:
+            query_terms |= terms(keyword)
+        for term in query_terms:
+            postings = self.term_index.get(term)
+            if postings is not None:
+                keyword_score[postings] += 1.0
+        if query_terms:
+            keyword_score /= len(query_terms)
+
+        score = (
+            WEIGHTS["genre"] * genre_score
+            + WEIGHTS["keyword"] * keyword_score
+            + WEIGHTS["vote"] * self.vote
+            + WEIGHTS["popularity"] * self.popularity
+        )
+        if genre_ids:
+            # Türü hiç tutmayan filmler elenir
+            score[genre_score == 0] = -np.inf
+
+        limit = min(limit, n)
+        top = np.argpartition(-score, limit - 1)[:limit]
+        top = top[np.argsort(-score[top])]
+        return [self.movies[i] for i in top if np.isfinite(score[i])]
+
+
+def load(path=CATALOG_PATH):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return Catalog(json.load(f))
+
+
+def save(movies, path=CATALOG_PATH):
+    # Önce geçici dosyaya yaz, sonra yerine taşı: okuyan süreçler yarım dosya görmez
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump([{field: movie.get(field) for field in FIELDS} for movie in movies], f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+_catalog = None
+_catalog_mtime = None
+_last_check = 0.0
+_lock = threading.Lock()
+
+
+def get_catalog():
+    """
+    Bellekteki kataloğu döndürür; dosya yoksa None.
+    Dosya güncellendiyse yeni katalog yüklenir ve atomik olarak değiştirilir;
+    yükleme sürerken diğer istekler eski kataloğu kullanmaya devam eder.
+    """
+    global _catalog, _catalog_mtime, _last_check
+    now = time.monotonic()
+    if _catalog is not None and now - _last_check < RELOAD_CHECK_INTERVAL:
+        return _catalog
+
+    if not _lock.acquire(blocking=_catalog is None):
+        return _catalog
+    try:
+        if _catalog is not None and now - _last_check < RELOAD_CHECK_INTERVAL:
+            return _catalog
+        _last_check = now
+        try:
+            mtime = os.path.getmtime(CATALOG_PATH)
+        except OSError:
+            return _catalog
+        if mtime != _catalog_mtime:
+            try:
+                _catalog = load(CATALOG_PATH)
+                _catalog_mtime = mtime
+                print(f"📚 Katalog yüklendi: {len(_catalog)} film")
+            except Exception as e:
+                print("❌ Katalog yüklenemedi:", e)
+        return _catalog
+    finally:
+        _lock.release()
+
+
+def search(genres, keywords=None, limit=20):
+    """
+    Türkçe tür isimleriyle katalogda arama yapar; katalog yoksa None, istenen türlerden hiçbiri
+    bilinmiyor ya da katalogda yoksa boş liste döner (her iki durumda da çağıran TMDb'ye geri düşebilir).
+    """
+    catalog = get_catalog()
+    if catalog is None:
+        return None
+    from tmdb_client import GENRES
+    genre_ids = [GENRES[g.lower()] for g in genres or [] if g.lower() in GENRES]
+    if genres and not genre_ids:
+        return []
+    return catalog.search(genre_ids, keywords, limit=limit)
+
+
+def sync(pages=100, path=CATALOG_PATH):
+    """
+    TMDb discover sonuçlarını toplu indirip kataloğu yeniler.
+    Genel popüler listeye ek olarak her tür için ayrı sayfalar da çekilir.
+    """
+    import tmdb_client
+
+    genre_ids = sorted(set(tmdb_client.GENRES.values()))
+    jobs = [(page, None) for page in range(1, pages + 1)]
+    jobs += [(page, genre_id) for genre_id in genre_ids for page in range(1, max(1, pages // 10) + 1)]
+
+    futures = [tmdb_client.get_discover_page_async(page, genre_id) for page, genre_id in jobs]
+
+    movies = {}
+    failed = 0
+    for future in futures:
+        try:
+            for movie in future.result():
+                movies[movie["id"]] = movie
+        except Exception as e:
+            failed += 1
+            print("❌ Sayfa alınamadı:", e)
+
+    save(list(movies.values()), path)
+    print(f"✅ Katalog güncellendi: {len(movies)} film, {len(jobs)} istek ({failed} başarısız)")
+    return len(movies)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yerel film kataloğunu TMDb'den günceller")
+    parser.add_argument("--sync", action="store_true")
+    parser.add_argument("--pages", type=int, default=100, help="genel popüler listeden çekilecek sayfa sayısı (en fazla 500)")
+    args = parser.parse_args()
+    if args.sync:
+        sync(min(args.pages, 500))
+    else:
+        parser.print_help()
@@ -0,0 +1,43 @@
+"""
+Film yorumları.
+Sayfa sorgusu (MovieId, CreatedAt) indeksini kullanır (bkz. schema.py); bir sonraki sayfanın
+olup olmadığını anlamak için sayfa boyutundan bir fazla satır okunur.
+"""
+from db import get_connection, page_clause
+
+
+def page_query(movie_id, page, page_size):
+    """:return: (SQL, parametreler); page 1'den başlar"""
+    page_sql, page_params = page_clause(page_size + 1, (page - 1) * page_size)
+    sql = f"""
+        SELECT Users.Username, Comments.CommentText, Comments.CreatedAt
+        FROM Comments JOIN Users ON Comments.UserId = Users.Id
+        WHERE MovieId = ?
+        ORDER BY CreatedAt DESC, Comments.Id DESC
+        {page_sql}
+    """
+    return sql, (movie_id, *page_params)
+
+
+def get_page(movie_id, page, page_size):
+    """
+    Filmin yorumlarından bir sayfa.
+    :return: (yorum sözlükleri, sonraki sayfa var mı)
+    """
+    sql, params = page_query(movie_id, page, page_size)
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    comments = [{"username": row.Username, "comment_text": row.CommentText,
+                 "created_at": row.CreatedAt.strftime("%d.%m.%Y %H:%M")} for row in rows[:page_size]]
+    return comments, len(rows) > page_size
+
+
+def add(user_id, movie_id, comment_text):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO Comments (UserId, MovieId, CommentText) VALUES (?, ?, ?)",
+                       (user_id, movie_id, comment_text))
+        conn.commit()
@@ -0,0 +1,299 @@
+"""
+Veritabanı bağlantı havuzu ve depolama arka uçları.
+Aynı uygulama kodu hem SQL Server (pyodbc) hem de SQLite üzerinde çalışabilir;
+arka uç DATABASE_URL ortam değişkeniyle seçilir:
+
+    DATABASE_URL=mssql://            -> SQL Server (varsayılan, MSSQL_CONNECTION_STRING)
+    DATABASE_URL=sqlite:///moodflix.db -> SQLite dosyası
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from metrics import span
+
+load_dotenv()
+
+DEFAULT_MSSQL_CONNECTION_STRING = (
+    'DRIVER={ODBC Driver 17 for SQL Server};'
+    'SERVER=localhost\\SQLEXPRESS;'
+    'DATABASE=MoodFlixDB;'
+    'Trusted_Connection=yes;'
+)
+
+
+class PoolTimeout(Exception):
+    """Havuzdan belirtilen süre içinde bağlantı alınamadığında fırlatılır."""
+
+
+class SqlServerBackend:
+    dialect = "sqlserver"
+
+    def __init__(self, connection_string=None):
+        self.connection_string = connection_string or os.getenv(
+            "MSSQL_CONNECTION_STRING", DEFAULT_MSSQL_CONNECTION_STRING
+        )
+
+    def connect(self):
+        import pyodbc
+        return pyodbc.connect(self.connection_string)
+
+    def ping(self, conn):
+        conn.cursor().execute("SELECT 1").fetchone()
+
+
+class Row(sqlite3.Row):
+    """pyodbc satırları gibi sütunlara öznitelik olarak da erişilebilen SQLite satırı (row.Username)."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except IndexError:
+            raise AttributeError(name) from None
+
+
+def _parse_timestamp(value):
+    return datetime.fromisoformat(value.decode())
+
+
+sqlite3.register_converter("TIMESTAMP", _parse_timestamp)
+sqlite3.register_converter("DATETIME", _parse_timestamp)
+
+
+class SQLiteBackend:
+    dialect = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+        conn.row_factory = Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA journal_mode = WAL")
+        with self._schema_lock:
+            if not self._schema_ready:
+                # Yerel denemelerde SQL Server olmadan çalışabilmek için tablolar otomatik oluşturulur
+                import schema
+                schema.create_all(conn, self.dialect)
+                self._schema_ready = True
+        return conn
+
+    def ping(self, conn):
+        conn.execute("SELECT 1").fetchone()
+
+
+def backend_from_url(url):
+    if url.startswith("sqlite:///"):
+        # Havuzdaki tüm bağlantılar aynı veriyi görmeli; bu yüzden dosya yolu zorunludur
+        return SQLiteBackend(url[len("sqlite:///"):])
+    if url.startswith("mssql://"):
+        return SqlServerBackend()
+    raise ValueError(f"Desteklenmeyen DATABASE_URL: {url}")
+
+
+class TimedCursor:
+    """İmleç sarmalayıcısı: her SQL ifadesi ve satır okuma metrics'e "db" span'i olarak yazılır."""
+
+    def __init__(self, cursor):
+        object.__setattr__(self, "_cursor", cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        # ör. cursor.fast_executemany = True asıl imlece geçer
+        setattr(self._cursor, name, value)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, sql, *params):
+        with span("db", "execute"):
+            self._cursor.execute(sql, *params)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        with span("db", "executemany"):
+            self._cursor.executemany(sql, seq_of_params)
+        return self
+
+    def fetchone(self):
+        with span("db", "fetch"):
+            return self._cursor.fetchone()
+
+    def fetchmany(self, size=1):
+        with span("db", "fetch"):
+            return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        with span("db", "fetch"):
+            return self._cursor.fetchall()
+
+
+class TimedConnection:
+    """Havuzdan verilen bağlantı; imleçleri TimedCursor ile sarar, diğer her şeyi asıl bağlantıya iletir."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self):
+        return TimedCursor(self._conn.cursor())
+
+    def commit(self):
+        with span("db", "commit"):
+            self._conn.commit()
+
+
+class ConnectionPool:
+    """
+    Sınırlı boyutlu bağlantı havuzu.
+    :param max_size: aynı anda açık olabilecek en fazla bağlantı
+    :param timeout: boş bağlantı beklerken en fazla beklenecek süre (saniye)
+    :param health_check_interval: bu süreden uzun boşta kalan bağlantı kullanılmadan önce kontrol edilir
+    """
+
+    def __init__(self, backend, max_size=10, timeout=5.0, health_check_interval=30.0):
+        self.backend = backend
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._idle = queue.LifoQueue()  # (bağlantı, son kullanım zamanı)
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self.created = 0
+        self.discarded = 0
+        self.checkouts = 0
+        self.in_use = 0
+
+    @property
+    def dialect(self):
+        return self.backend.dialect
+
+    def acquire(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f"{self.timeout} saniye içinde veritabanı bağlantısı alınamadı")
+        try:
+            conn = self._checkout_idle()
+            if conn is None:
+                conn = self.backend.connect()
+                with self._lock:
+                    self.created += 1
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+        return conn
+
+    def _checkout_idle(self):
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+            if time.monotonic() - last_used < self.health_check_interval:
+                return conn
+            try:
+                self.backend.ping(conn)
+                return conn
+            except Exception:
+                self._discard(conn)
+
+    def release(self, conn, broken=False):
+        try:
+            if not broken:
+                try:
+                    # Commit edilmemiş işlemler bir sonraki kullanıcıya taşınmasın
+                    conn.rollback()
+                except Exception:
+                    broken = True
+            if broken:
+                self._discard(conn)
+            else:
+                self._idle.put((conn, time.monotonic()))
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._slots.release()
+
+    def _discard(self, conn):
+        with self._lock:
+            self.discarded += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self):
+        """
+        with pool.connection() as conn: ... şeklinde kullanılır;
+        blok bitince bağlantı kapatılmaz, havuza geri verilir.
+        """
+        with span("db", "acquire"):
+            conn = self.acquire()
+        broken = False
+        try:
+            yield TimedConnection(conn)
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            raise
+        finally:
+            self.release(conn, broken=broken)
+
+    def close_all(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "idle": self._idle.qsize(),
+                "in_use": self.in_use,
+                "created": self.created,
+                "discarded": self.discarded,
+                "checkouts": self.checkouts,
+            }
+
+
+pool = ConnectionPool(
+    backend_from_url(os.getenv("DATABASE_URL", "mssql://")),
+    max_size=int(os.getenv("DB_POOL_SIZE", 10)),
+    timeout=float(os.getenv("DB_POOL_TIMEOUT", 5)),
+)
+
+
+def page_clause(limit, offset=0):
+    """
+    ORDER BY'dan sonra eklenecek, arka uca uygun sayfalama parçası ve parametreleri.
+    :return: (SQL parçası, parametre listesi)
+    """
+    if pool.dialect == "sqlserver":
+        return "OFFSET ? ROWS FETCH NEXT ? ROWS ONLY", [offset, limit]
+    return "LIMIT ? OFFSET ?", [limit, offset]
+
+
+def get_connection():
+    """Havuzdan bir bağlantı alan context manager: with get_connection() as conn: ..."""
+    return pool.connection()
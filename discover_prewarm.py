@@ -0,0 +1,195 @@
+"""
+TMDb discover sonuçlarının arka planda önceden hazırlanması.
+/recommend'in yapabileceği discover istekleri sınırlıdır: analiz en fazla 7 türden seçer, yani
+127 tür kombinasyonu (tek dil) vardır. Arka plandaki zamanlayıcı bu kombinasyonların sonuçlarını
+önceden çeker ve düzenli olarak yeniler; kullanıcı isteği hazır sonucu bellekten okur.
+
+- Hangi kombinasyonun ne sıklıkla yenileneceği gözlenen istek sıklığına göre belirlenir
+  (sık istenen kombinasyonlar daha taze tutulur, sayaçlar her turda yarıya iner)
+- Saatlik TMDb istek bütçesi (DISCOVER_PREWARM_BUDGET) aşılmaz; bütçe tüm sunucu içindir ve
+  WEB_CONCURRENCY işçi süreci arasında eşit bölünür (her süreç kendi zamanlayıcısını çalıştırır)
+- Zamanlayıcı iş parçacığı fork'tan sağ çıkmadığı için modül yüklenirken değil, her süreçte ilk
+  istekte başlatılır (init_app); pre-fork sunucularda her işçi kendi zamanlayıcısına sahip olur
+- Yeni sonuçlar ayrı bir sözlükte hazırlanıp tek atamayla devreye alınır; okuyucular kilit beklemez
+"""
+import itertools
+import os
+import threading
+import time
+from collections import Counter
+
+import tmdb_client
+from mood_lexicon import GENRE_LABELS
+
+PREWARM_ENABLED = os.getenv("DISCOVER_PREWARM", "0") == "1"
+PREWARM_INTERVAL = float(os.getenv("DISCOVER_PREWARM_INTERVAL", 300))
+# Saatte en fazla bu kadar TMDb isteği yapılır (tüm işçi süreçleri toplamı)
+PREWARM_BUDGET = int(os.getenv("DISCOVER_PREWARM_BUDGET", 600))
+# Bütçeyi paylaşan işçi süreci sayısı (gunicorn ile aynı değişken)
+PREWARM_PROCESSES = max(1, int(os.getenv("WEB_CONCURRENCY", 1)))
+# Bu süreden yeni sonuçlar yenilenmez (bütçe sık istenen ama zaten taze sonuçlara harcanmasın)
+MIN_REFRESH_AGE = float(os.getenv("DISCOVER_PREWARM_MIN_AGE", 900))
+
+# (sıralı tür ID'leri) -> (filmler, çekilme zamanı); sadece yeni sözlük atanarak değiştirilir
+_snapshot = {}
+_counts = Counter()
+_counts_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+_stop = threading.Event()
+_start_lock = threading.Lock()
+_thread = None
+_thread_pid = None
+
+hits = 0
+misses = 0
+requests_made = 0
+failures = 0
+
+
+def genre_key(genres):
+    """Tür isimlerini sıra ve tekrar bağımsız bir anahtara çevirir; bilinen tür yoksa None."""
+    ids = {tmdb_client.GENRES.get(genre.lower()) for genre in genres or []}
+    ids.discard(None)
+    return tuple(sorted(ids)) or None
+
+
+def reachable_keys():
+    """Analizin üretebileceği tüm tür kombinasyonları (7 tür için 127 anahtar)."""
+    keys = set()
+    for size in range(1, len(GENRE_LABELS) + 1):
+        for combo in itertools.combinations(GENRE_LABELS, size):
+            keys.add(genre_key(combo))
+    return keys
+
+
+def lookup(genres):
+    """
+    Önceden hazırlanmış discover sonucunu döndürür; yoksa None (çağıran TMDb'ye gider).
+    Her çağrı kombinasyonun istek sıklığına eklenir.
+    """
+    global hits, misses
+    key = genre_key(genres)
+    if key is None:
+        return None
+    entry = _snapshot.get(key)
+    with _counts_lock:
+        _counts[key] += 1
+        if entry is None:
+            misses += 1
+        else:
+            hits += 1
+    return None if entry is None else entry[0]
+
+
+def _cycle_budget():
+    return max(1, int(PREWARM_BUDGET / PREWARM_PROCESSES * PREWARM_INTERVAL / 3600))
+
+
+def plan(now=None, budget=None):
+    """
+    Bu turda çekilecek anahtarları öncelik sırasıyla seçer:
+    önce hiç çekilmemiş olanlar (sık istenen önce), sonra (sıklık + 1) x yaş puanına göre eskiyenler.
+    """
+    now = now or time.time()
+    budget = _cycle_budget() if budget is None else budget
+    snapshot = _snapshot
+    with _counts_lock:
+        counts = dict(_counts)
+
+    missing, stale = [], []
+    for key in reachable_keys() | set(counts):
+        frequency = counts.get(key, 0)
+        entry = snapshot.get(key)
+        if entry is None:
+            missing.append((-frequency, key))
+            continue
+        age = now - entry[1]
+        if age >= MIN_REFRESH_AGE:
+            stale.append((-(frequency + 1) * age, key))
+
+    ordered = [key for _, key in sorted(missing)] + [key for _, key in sorted(stale)]
+    return ordered[:budget]
+
+
+def refresh_once(budget=None):
+    """
+    Bir yenileme turu çalıştırır ve yeni sonuçları tek seferde devreye alır.
+    :return: başarıyla yenilenen kombinasyon sayısı
+    """
+    global _snapshot, requests_made, failures
+    with _refresh_lock:
+        keys = plan(budget=budget)
+        futures = {
+            key: tmdb_client.get_discover_page_async(1, ",".join(map(str, key)))
+            for key in keys
+        }
+        fresh = {}
+        failed = 0
+        for key, future in futures.items():
+            try:
+                fresh[key] = (future.result(), time.time())
+            except Exception as e:
+                # Eski sonuç (varsa) kullanılmaya devam eder
+                failed += 1
+                print(f"❌ Discover ön hazırlığı başarısız ({key}):", e)
+        with _counts_lock:
+            requests_made += len(futures)
+            failures += failed
+
+        if fresh:
+            _snapshot = {**_snapshot, **fresh}
+
+        # Sıklıklar yavaşça unutulur; güncel ilgi öne çıkar
+        with _counts_lock:
+            for key in list(_counts):
+                _counts[key] /= 2
+                if _counts[key] < 0.01:
+                    del _counts[key]
+    return len(fresh)
+
+
+def _run():
+    while not _stop.is_set():
+        try:
+            refreshed = refresh_once()
+            print(f"🔥 Discover ön hazırlığı: {refreshed} kombinasyon yenilendi, toplam {len(_snapshot)}")
+        except Exception as e:
+            print("❌ Discover ön hazırlık turu başarısız:", e)
+        _stop.wait(PREWARM_INTERVAL)
+
+
+def start():
+    """Bu süreçte arka plan zamanlayıcısını başlatır (birden fazla çağrı ve fork sonrası çağrı güvenlidir)."""
+    global _thread, _thread_pid
+    with _start_lock:
+        if _thread_pid == os.getpid() and _thread.is_alive():
+            return
+        _stop.clear()
+        _thread = threading.Thread(target=_run, name="discover-prewarm", daemon=True)
+        _thread.start()
+        _thread_pid = os.getpid()
+
+
+def init_app(app):
+    """Zamanlayıcıyı her süreçte ilk Flask isteğinde başlatır (fork'tan sonra, işçinin kendisinde)."""
+
+    @app.before_request
+    def _start_prewarm():
+        if _thread_pid != os.getpid():
+            start()
+
+
+def stop():
+    _stop.set()
+
+
+def stats():
+    # Sayaçlar istek ve zamanlayıcı iş parçacıklarından _counts_lock altında güncellenir
+    with _counts_lock:
+        return {
+            "entries": len(_snapshot),
+            "hits": hits,
+            "misses": misses,
+            "requests": requests_made,
+            "failures": failures,
+        }
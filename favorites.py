@@ -0,0 +1,161 @@
+"""
+Favori filmler.
+Ekleme tek ifadelik bir upsert'tür: önce SELECT sonra INSERT yapmak iki gidiş-dönüş
+gerektiriyordu ve aynı anda gelen iki istekte tekrar eden kayıt oluşturabiliyordu.
+Benzersizlik (UserId, MovieId) indeksiyle de garanti altındadır (bkz. schema.py).
+
+Her kullanıcının favori film ID'leri ilk ihtiyaçta bir kez okunur ve bellekte sıralı bir tamsayı
+dizisi olarak tutulur; "favorilerde mi?" kontrolü ve favori listesi veritabanına gitmez. Ekleme ve silme önce
+veritabanına yazılır, sonra bellekteki kümeye işlenir (write-through). Uzun süredir gelmeyen
+kullanıcıların kümeleri LRU ile çıkarılır.
+
+Birden fazla işçi sürecinde başka bir süreçteki değişiklik en geç FAVORITES_CACHE_TTL sonra görülür;
+add_change_listener ile değişiklikler diğer süreçlere yayınlanıp orada invalidate() çağrılabilir.
+"""
+import bisect
+import os
+import threading
+from array import array
+
+from cache import MISSING, TTLCache
+from db import get_connection, pool
+
+FAVORITES_CACHE_MAX_USERS = int(os.getenv("FAVORITES_CACHE_MAX_USERS", 10000))
+# Diğer süreçlerde yapılan değişikliklerin en geç ne zaman görüleceği (saniye)
+FAVORITES_CACHE_TTL = int(os.getenv("FAVORITES_CACHE_TTL", 300))
+
+# user_id -> sıralı array("q"); diziler yerinde değiştirilmez, her yazmada yenisi atanır
+_cache = TTLCache("favorites", maxsize=FAVORITES_CACHE_MAX_USERS, default_ttl=FAVORITES_CACHE_TTL)
+# Aynı kullanıcı için eşzamanlı iki yazmanın birbirinin güncellemesini ezmemesi için
+_write_lock = threading.Lock()
+# Her yazmada (ve invalidate'te) artar; okuma sürerken yazma olduysa okunan eski görüntü önbelleğe yazılmaz
+_generation = 0
+_listeners = []
+
+ADD_SQL = {
+    "sqlserver": """
+        INSERT INTO Favorites (UserId, MovieId)
+        SELECT ?, ?
+        WHERE NOT EXISTS (
+            SELECT 1 FROM Favorites WITH (UPDLOCK, HOLDLOCK) WHERE UserId = ? AND MovieId = ?
+        )
+    """,
+    "sqlite": """
+        INSERT INTO Favorites (UserId, MovieId) VALUES (?, ?)
+        ON CONFLICT (UserId, MovieId) DO NOTHING
+    """,
+}
+MOVIE_IDS_SQL = "SELECT MovieId FROM Favorites WHERE UserId = ?"
+REMOVE_SQL = "DELETE FROM Favorites WHERE UserId = ? AND MovieId = ?"
+
+
+def _load(user_id):
+    """
+    Kullanıcının favori ID'lerini (UserId, MovieId) indeksinden okuyup önbelleğe alır.
+    Okuma sırasında bir yazma olduysa sonuç önbelleğe yazılmaz (write-through ile gelen güncel
+    kümeyi eski görüntüyle ezmemek için); bir sonraki okuma yeniden yükler.
+    """
+    with _write_lock:
+        generation = _generation
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(MOVIE_IDS_SQL, (user_id,))
+        ids = array("q", sorted(row.MovieId for row in cursor.fetchall()))
+    with _write_lock:
+        if generation == _generation:
+            _cache.set(user_id, ids)
+    return ids
+
+
+def _ids(user_id):
+    ids = _cache.get(user_id)
+    return _load(user_id) if ids is MISSING else ids
+
+
+def _contains(ids, movie_id):
+    index = bisect.bisect_left(ids, movie_id)
+    return index < len(ids) and ids[index] == movie_id
+
+
+def _write_through(user_id, movie_id, present):
+    """Veritabanına yazılan değişikliği kullanıcının önbellekteki kümesine işler (küme yoksa dokunmaz)."""
+    global _generation
+    with _write_lock:
+        _generation += 1
+        ids = _cache.get(user_id)
+        if ids is MISSING or _contains(ids, movie_id) == present:
+            return
+        updated = array("q", ids)
+        index = bisect.bisect_left(updated, movie_id)
+        if present:
+            updated.insert(index, movie_id)
+        else:
+            del updated[index]
+        _cache.set(user_id, updated)
+
+
+def _notify(user_id):
+    for listener in _listeners:
+        try:
+            listener(user_id)
+        except Exception as e:
+            print("❌ Favori değişikliği yayınlanamadı:", e)
+
+
+def add(user_id, movie_id):
+    """
+    Filmi favorilere ekler.
+    :return: film yeni eklendiyse True, zaten favorilerdeyse False
+    """
+    # Önbellekteki küme başka bir süreçteki silmeyi henüz görmemiş olabilir; ekleme her zaman
+    # veritabanında yapılır (upsert tekrarlı eklemede zaten hiçbir şey yazmaz)
+    params = (user_id, movie_id) * 2 if pool.dialect == "sqlserver" else (user_id, movie_id)
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(ADD_SQL[pool.dialect], params)
+        added = cursor.rowcount == 1
+        conn.commit()
+    # Başka bir süreç eklemiş olsa da (added False) film artık favorilerdedir
+    _write_through(user_id, movie_id, True)
+    if added:
+        _notify(user_id)
+    return added
+
+
+def remove(user_id, movie_id):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(REMOVE_SQL, (user_id, movie_id))
+        conn.commit()
+    _write_through(user_id, movie_id, False)
+    _notify(user_id)
+
+
+def is_favorite(user_id, movie_id):
+    """Bellekteki kümeden bakılır; kullanıcının kümesi yoksa bir kez yüklenir."""
+    return _contains(_ids(user_id), movie_id)
+
+
+def movie_ids(user_id):
+    """Kullanıcının favori film ID'leri (artan sırada)."""
+    return list(_ids(user_id))
+
+
+def invalidate(user_id):
+    """Kullanıcının önbellekteki kümesini siler; bir sonraki okuma veritabanından yapılır."""
+    global _generation
+    with _write_lock:
+        _generation += 1
+        _cache.delete(user_id)
+
+
+def add_change_listener(listener):
+    """
+    Bu süreçte bir kullanıcının favorileri değiştiğinde listener(user_id) çağrılır.
+    Çok süreçli kurulumlarda değişikliği diğer süreçlere iletip orada invalidate() çağırmak için kullanılır.
+    """
+    _listeners.append(listener)
+
+
+def cache_stats():
+    return _cache.stats()
@@ -0,0 +1,76 @@
+"""
+Film detay sayfası için işlenmiş HTML parçası önbelleği.
+Sayfanın büyük kısmı (afiş, özet, oyuncular, türler, platformlar) her kullanıcı için aynıdır;
+bu blok (film ID, dil) başına bir kez işlenip saklanır. Yorum listesi film ve sayfa başına
+saklanır ve yorum eklendiğinde o filmin tüm yorum sayfaları geçersiz olur.
+
+Her parça ETag üretiminde kullanılmak üzere içeriğinin özetiyle birlikte tutulur.
+"""
+import hashlib
+import itertools
+import os
+import threading
+from collections import namedtuple
+
+from cache import MISSING, TTLCache
+
+# Film bilgisi TMDb detay sayfası yanıtıyla aynı sürede yenilenir
+FRAGMENT_MOVIE_TTL = int(os.getenv("FRAGMENT_MOVIE_TTL", 24 * 3600))
+# Yorumlar bu süreyi geçmeden yenilenir (başka bir süreçte eklenen yorumlar için üst sınır)
+FRAGMENT_COMMENTS_TTL = int(os.getenv("FRAGMENT_COMMENTS_TTL", 60))
+FRAGMENT_CACHE_MAXSIZE = int(os.getenv("FRAGMENT_CACHE_MAXSIZE", 1024))
+
+Fragment = namedtuple("Fragment", ["html", "etag"])
+
+movie_info_cache = TTLCache("fragment:movie_info", maxsize=FRAGMENT_CACHE_MAXSIZE, default_ttl=FRAGMENT_MOVIE_TTL)
+comments_cache = TTLCache("fragment:comments", maxsize=FRAGMENT_CACHE_MAXSIZE, default_ttl=FRAGMENT_COMMENTS_TTL)
+
+# Film başına yorum "nesli"; yorum eklenince yenilenir ve eski sayfalar anahtar dışında kalır.
+# Nesiller de sınırlı bir önbellekte tutulur; kaydı düşen film bir sonraki okumada hiç kullanılmamış
+# yeni bir nesil alır, bu yüzden çıkarma eski sayfaları geri getirmez (en fazla yeniden işlenir)
+comment_generations = TTLCache("fragment:comment_generations", maxsize=FRAGMENT_CACHE_MAXSIZE,
+                               default_ttl=FRAGMENT_COMMENTS_TTL)
+_next_generation = itertools.count(1)
+_generations_lock = threading.Lock()
+
+
+def make_fragment(html):
+    return Fragment(html, hashlib.sha1(html.encode("utf-8")).hexdigest()[:16])
+
+
+def get_movie_info(movie_id, language):
+    """Önbellekteki film bilgisi bloğu; yoksa None (çağıran TMDb'ye gidip set_movie_info ile saklar)."""
+    fragment = movie_info_cache.get((movie_id, language))
+    return None if fragment is MISSING else fragment
+
+
+def set_movie_info(movie_id, language, fragment):
+    movie_info_cache.set((movie_id, language), fragment)
+
+
+def comments(movie_id, page, render):
+    """
+    Filmin yorum sayfasını önbellekten döndürür; yoksa render() ile üretip saklar.
+    :param render: Fragment döndüren fonksiyon
+    """
+    with _generations_lock:
+        generation = comment_generations.get(movie_id)
+        if generation is MISSING:
+            generation = next(_next_generation)
+            comment_generations.set(movie_id, generation)
+    key = (movie_id, generation, page)
+    fragment = comments_cache.get(key)
+    if fragment is MISSING:
+        fragment = render()
+        comments_cache.set(key, fragment)
+    return fragment
+
+
+def invalidate_comments(movie_id):
+    """Filmin önbellekteki tüm yorum sayfalarını geçersiz kılar (yeni yorum eklendiğinde)."""
+    with _generations_lock:
+        comment_generations.set(movie_id, next(_next_generation))
+
+
+def stats():
+    return [movie_info_cache.stats(), comments_cache.stats(), comment_generations.stats()]
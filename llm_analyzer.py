@@ -1,13 +1,220 @@
 import os
 import json
-import google.generativeai as genai
+import threading
 from dotenv import load_dotenv
+from cache import MISSING, DiskStore, TTLCache
+import metrics
+import resilience
+from llm_batcher import MicroBatcher
+import mood_lexicon
+from mood_lexicon import normalize_input
 
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=GEMINI_API_KEY)
+
+GEMINI_MODEL_NAME = "gemini-1.5-flash"
+
+# Sözlük sınıflandırıcısının güveni bu eşiğin altındaysa Gemini'ye gidilir
+LEXICON_CONFIDENCE_THRESHOLD = float(os.getenv("LEXICON_CONFIDENCE_THRESHOLD", 0.6))
+
+# Aynı ruh hali tekrar tekrar yazıldığında Gemini'ye yeniden gitmemek için analiz önbelleği
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600))
+LLM_CACHE_MAXSIZE = int(os.getenv("LLM_CACHE_MAXSIZE", 10000))
+_llm_cache_path = os.getenv("LLM_CACHE_PATH")
+
+analysis_cache = TTLCache(
+    "llm:analysis",
+    maxsize=LLM_CACHE_MAXSIZE,
+    default_ttl=LLM_CACHE_TTL,
+    disk_store=DiskStore(_llm_cache_path) if _llm_cache_path else None,
+)
+
+# Tek bir Gemini çağrısının en uzun süresi (isteğin kalan süre bütçesi daha kısaysa o kullanılır)
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", 8))
+GEMINI_RETRY_ATTEMPTS = int(os.getenv("GEMINI_RETRY_ATTEMPTS", 2))
+
+# Gemini art arda hata verirse çağrılar bir süre hemen reddedilir (analiz yedek aşamaya düşer);
+# aynı girdinin süren analizini bekleyen istekler o sonucu paylaşır
+_breaker = resilience.CircuitBreaker("gemini")
+_flight = resilience.SingleFlight()
+
+# Mikro-toplama: eşzamanlı girdiler LLM_BATCH_WINDOW_MS içinde toplanıp tek çağrıda analiz edilir
+# (0 ise kapalı, her girdi için ayrı çağrı yapılır)
+LLM_BATCH_WINDOW_MS = float(os.getenv("LLM_BATCH_WINDOW_MS", 0))
+LLM_BATCH_MAX_SIZE = int(os.getenv("LLM_BATCH_MAX_SIZE", 16))
+LLM_BATCH_CONCURRENCY = int(os.getenv("LLM_BATCH_CONCURRENCY", 8))
+
+# Model nesnesi ilk kullanımda bir kez oluşturulur ve tüm isteklerde yeniden kullanılır.
+# google.generativeai (grpc, protobuf, pydantic) yüklemesi de o ana ertelenir; açılışı en çok o yavaşlatır.
+_model = None
+_model_lock = threading.Lock()
+
+
+def set_model(model):
+    """Gemini model nesnesini değiştirir (benchmark'larda sahte model kullanmak için)."""
+    global _model
+    _model = model
+
+
+def get_model():
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                import google.generativeai as genai
+                genai.configure(api_key=GEMINI_API_KEY)
+                _model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+    return _model
+
 
 def analyze_user_input(user_input):
+    """
+    Kullanıcı girdisini analiz eder; normalleştirilmiş girdi daha önce analiz edildiyse
+    sonucu önbellekten döndürür.
+    """
+    key = normalize_input(user_input)
+    cached = analysis_cache.get(key)
+    if cached is not MISSING:
+        return cached
+    return _flight.do(key, _analyze_and_cache, key, user_input)
+
+
+def _analyze_and_cache(key, user_input):
+    stage, result = _run_stages(user_input)
+    # Boş (başarısız) ve yedek aşamadan gelen analizler önbelleğe yazılmaz, bir sonraki istekte tekrar denenir
+    if result.get("turler") and stage != "degraded":
+        analysis_cache.set(key, result)
+    return result
+
+
+def lexicon_stage(user_input):
+    """Sözlük tabanlı hızlı yol; güven eşiğin altındaysa None döner ve sıradaki aşamaya geçilir."""
+    result = mood_lexicon.classify(user_input)
+    if result["turler"] and result["guven"] >= LEXICON_CONFIDENCE_THRESHOLD:
+        return {"turler": result["turler"], "anahtar_kelimeler": result["anahtar_kelimeler"]}
+    return None
+
+
+def gemini_stage(user_input):
+    """Gemini'ye ulaşılamazsa (devre açık, bütçe doldu, denemeler tükendi) None döner."""
+    if batcher is not None:
+        try:
+            result = batcher.submit(user_input, timeout=resilience.timeout_for(GEMINI_TIMEOUT))
+        except (TimeoutError, resilience.DeadlineExceeded):
+            return None
+        if result is not None:
+            return result
+        # Parti yanıtı okunamadıysa bu girdi tek başına analiz edilir
+    return _analyze_with_gemini(user_input)
+
+
+def degraded_stage(user_input):
+    """
+    Gemini'ye ulaşılamadığında yedek yol: süresi dolmuş önbellek kaydı, o da yoksa güven eşiğinin
+    altında kalmış olsa da sözlük sonucu.
+    """
+    stale = analysis_cache.get_stale(normalize_input(user_input))
+    if stale is not MISSING:
+        return stale
+    result = mood_lexicon.classify(user_input)
+    if result["turler"]:
+        return {"turler": result["turler"], "anahtar_kelimeler": result["anahtar_kelimeler"]}
+    return None
+
+
+# Sırayla denenen analiz aşamaları: None döndürmeyen ilk aşamanın sonucu kullanılır
+ANALYZER_STAGES = [
+    ("lexicon", lexicon_stage),
+    ("gemini", gemini_stage),
+    ("degraded", degraded_stage),
+]
+
+# Her aşamanın kaç isteği sonuçlandırdığı (hızlı yolun LLM trafiğini ne kadar azalttığını görmek için);
+# istek ve toplu iş iş parçacıklarından artırıldığı için kilitle güncellenir
+stage_counts = {name: 0 for name, _ in ANALYZER_STAGES}
+_stage_counts_lock = threading.Lock()
+
+
+def run_pipeline(user_input):
+    return _run_stages(user_input)[1]
+
+
+def _run_stages(user_input):
+    """:return: (sonucu veren aşama adı ya da None, analiz)"""
+    for name, stage in ANALYZER_STAGES:
+        result = stage(user_input)
+        if result is not None:
+            with _stage_counts_lock:
+                stage_counts[name] = stage_counts.get(name, 0) + 1
+            return name, result
+    return None, {
+        "turler": [],
+        "anahtar_kelimeler": []
+    }
+
+
+def _strip_code_fence(response_text):
+    if "```" in response_text:
+        return response_text.replace("```json", "").replace("```", "").strip()
+    return response_text
+
+
+def _generate_once(prompt):
+    try:
+        return get_model().generate_content(
+            prompt, request_options={"timeout": resilience.timeout_for(GEMINI_TIMEOUT)})
+    except resilience.DeadlineExceeded:
+        raise
+    except Exception as e:
+        # Gemini istemcisinin hata türleri (kota, zaman aşımı, 5xx) geçici sayılır
+        raise resilience.RetryableError(f"Gemini çağrısı başarısız: {e}") from e
+
+
+def _generate(prompt):
+    """Gemini çağrısını süre bütçesi, yeniden deneme ve devre kesici ile yapar."""
+    return resilience.call(_breaker, _generate_once, prompt, attempts=GEMINI_RETRY_ATTEMPTS)
+
+
+def _is_analysis(parsed):
+    return isinstance(parsed, dict) and "turler" in parsed and "anahtar_kelimeler" in parsed
+
+
+def _analyze_batch_with_gemini(user_inputs):
+    """
+    Birden fazla girdiyi tek çağrıda analiz eder.
+    :return: girdilerle aynı sırada analiz listesi; okunamayan öğeler None
+    """
+    prompt = f"""
+    Birden fazla kullanıcı film tavsiyesi istiyor. Aşağıdaki JSON dizisindeki her girdiyi ayrı ayrı analiz et.
+    Her girdi için, TMDb API'sinde arama yapmak için kullanılabilecek film türlerini ve anahtar kelimeleri
+    içeren bir JSON nesnesi oluştur. Her nesne 'turler' ve 'anahtar_kelimeler' adında iki anahtar içermelidir.
+    'turler' listesi şu seçeneklerden oluşabilir: Aksiyon, Komedi, Dram, Korku, Bilim Kurgu, Romantik, Macera.
+    'anahtar_kelimeler' listesi ise metindeki önemli temaları içermelidir.
+    Çıktı, girdilerle aynı sırada ve aynı uzunlukta ({len(user_inputs)} öğe) bir JSON dizisi olmalıdır.
+    Girdiler: {json.dumps(user_inputs, ensure_ascii=False)}
+    """
+
+    with metrics.span("llm", "gemini_batch"):
+        response = _generate(prompt)
+        response_text = response.text.strip()
+
+    parsed = json.loads(_strip_code_fence(response_text))
+    if not isinstance(parsed, list) or len(parsed) != len(user_inputs):
+        raise ValueError("Parti yanıtı girdilerle aynı uzunlukta bir JSON dizisi değil")
+    return [item if _is_analysis(item) else None for item in parsed]
+
+
+batcher = None
+if LLM_BATCH_WINDOW_MS > 0:
+    batcher = MicroBatcher(
+        _analyze_batch_with_gemini,
+        window=LLM_BATCH_WINDOW_MS / 1000,
+        max_batch=LLM_BATCH_MAX_SIZE,
+        concurrency=LLM_BATCH_CONCURRENCY,
+    )
+
+
+def _analyze_with_gemini(user_input):
     prompt = f"""
     Bir kullanıcı film tavsiyesi istiyor. Kullanıcının şu girdisini analiz et:
     '{user_input}'. Bu girdiye dayanarak, TMDb API'sinde arama yapmak için kullanılabilecek film türlerini ve 
@@ -18,18 +225,19 @@ def analyze_user_input(user_input):
     """
 
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
+        with metrics.span("llm", "gemini"):
+            try:
+                response = _generate(prompt)
+            except resilience.UpstreamError as e:
+                print("⚠️ Gemini'ye ulaşılamadı, yedek analiz kullanılacak:", e)
+                return None
+            response_text = response.text.strip()
 
         # 🔍 Yanıtı terminale yaz (gelen cevabı görmek için)
         print("➡️ Gemini'den gelen ham cevap:\n", response_text)
 
         # Kod bloğu varsa temizle
-        if "```" in response_text:
-            cleaned = response_text.replace("```json", "").replace("```", "").strip()
-        else:
-            cleaned = response_text
+        cleaned = _strip_code_fence(response_text)
 
         # 🧪 JSON olup olmadığını anlamak için bir test
         try:
@@ -43,7 +251,7 @@ def analyze_user_input(user_input):
             }
 
         # ✅ Beklenen yapıda mı kontrol et
-        if not isinstance(parsed, dict) or "turler" not in parsed or "anahtar_kelimeler" not in parsed:
+        if not _is_analysis(parsed):
             print("[Yapı Hatası]: JSON nesnesi beklenen formatta değil.")
             print("➡️ Gelen veri:", parsed)
             return {
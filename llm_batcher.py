@@ -0,0 +1,134 @@
+"""
+Eşzamanlı analiz isteklerini toplayan mikro-toplayıcı (micro-batcher).
+Yoğun anlarda aynı saniye içinde onlarca bağımsız ruh hali gelir; her biri için ayrı bir
+Gemini çağrısı yapmak hem hız sınırına takılır hem de çağrı başına ek maliyet öder.
+İlk girdi geldiğinde kısa bir pencere (window) açılır; pencere dolana ya da max_batch
+girdiye ulaşılana kadar gelenler tek bir çağrıda işlenir ve sonuçlar bekleyen isteklere dağıtılır.
+Parti çağrısı, partideki isteklerin süre bütçelerinden en erken biteniyle sınırlıdır.
+Toplayıcı iş parçacığı fork'tan sağ çıkmadığı için her süreçte ilk submit() çağrısında başlatılır.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import resilience
+
+
+class MicroBatcher:
+    """
+    :param process: girdi listesini alıp aynı sırada sonuç listesi döndüren fonksiyon;
+                    sonucu alınamayan girdi için None döndürebilir, hata fırlatırsa tüm parti None olur
+    :param window: ilk girdiden sonra partinin toplanacağı süre (saniye)
+    :param max_batch: bir partideki en fazla farklı girdi
+    :param concurrency: aynı anda işlenebilecek en fazla parti
+    """
+
+    def __init__(self, process, window=0.05, max_batch=16, concurrency=4):
+        self.process = process
+        self.window = window
+        self.max_batch = max_batch
+        self.concurrency = concurrency
+        self._queue = queue.Queue()
+        self._start_lock = threading.Lock()
+        self._owner_pid = None
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.failed_items = 0
+
+    def submit(self, item, timeout=None):
+        """
+        Girdiyi bir sonraki partiye ekler ve sonucunu bekler (sonuç yoksa None).
+        Çağıranın süre bütçesi (varsa) partiye taşınır.
+        """
+        if self._owner_pid != os.getpid():
+            self._start()
+        future = Future()
+        self._queue.put((item, future, resilience.current_deadline()))
+        return future.result(timeout)
+
+    def _start(self):
+        """
+        Kuyruğu, işçi havuzunu ve toplayıcı iş parçacığını bu süreç için kurar. Fork sonrası
+        çocuk süreç ebeveynin iş parçacıklarını devralmaz; ebeveynin kuyruğu ve havuzu orada kullanılamaz.
+        """
+        with self._start_lock:
+            if self._owner_pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="llm-batch")
+            # Parti ancak boşta bir işçi varken toplanır; işçiler meşgulken biriken girdiler
+            # küçük partiler halinde sıraya girmez, bir sonraki partiyi doldurur
+            self._slots = threading.Semaphore(self.concurrency)
+            self._thread = threading.Thread(target=self._run, name="llm-batcher", daemon=True)
+            self._thread.start()
+            self._owner_pid = os.getpid()
+
+    def _run(self):
+        while True:
+            self._slots.acquire()
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len({entry[0] for entry in batch}) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._executor.submit(self._process, batch)
+
+    def _process(self, batch):
+        try:
+            self._process_batch(batch)
+        finally:
+            self._slots.release()
+
+    def _process_batch(self, batch):
+        # Aynı girdiyi bekleyen istekler tek bir sonucu paylaşır; bütçesi bitmiş (artık
+        # beklemeyen) isteklerin girdileri partiye alınmaz
+        now = time.monotonic()
+        waiters = {}
+        deadlines = []
+        for item, future, deadline in batch:
+            if deadline is not None and deadline <= now:
+                future.set_result(None)
+                continue
+            waiters.setdefault(item, []).append(future)
+            if deadline is not None:
+                deadlines.append(deadline)
+        items = list(waiters)
+        if not items:
+            return
+
+        try:
+            if deadlines:
+                with resilience.budget(min(deadlines) - now):
+                    results = self.process(items)
+            else:
+                results = self.process(items)
+            if len(results) != len(items):
+                raise ValueError(f"{len(items)} girdi için {len(results)} sonuç döndü")
+        except Exception as e:
+            print(f"❌ Parti işlenemedi ({len(items)} girdi):", e)
+            results = [None] * len(items)
+
+        with self._stats_lock:
+            self.batches += 1
+            self.items += len(items)
+            self.failed_items += sum(result is None for result in results)
+        for item, result in zip(items, results):
+            for future in waiters[item]:
+                future.set_result(result)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "failed_items": self.failed_items,
+                "pending": self._queue.qsize(),
+            }
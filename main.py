@@ -1,44 +1,227 @@
-# Kullanıcının doğal dil girdisini analiz ederek film türü ve anahtar kelime çıkaran fonksiyon
-from llm_analyzer import analyze_user_input
+"""
+Toplu öneri komut satırı aracı (çevrimdışı değerlendirme için).
+Ruh hali girdileri bir JSONL dosyasından ya da standart girdiden satır satır okunur; her girdi
+analiz + film bulma akışından (/recommend ile aynı: katalog -> hazır discover -> TMDb) sınırlı
+eşzamanlılıkla geçirilir. Sonuçlar tamamlandıkça JSONL olarak yazılır, sonunda verim ve gecikme
+özeti yazdırılır. Veritabanına (geçmiş, zevk profili) hiçbir şey yazılmaz.
 
-# Tür ve anahtar kelimelere göre popüler filmleri getiren TMDb API fonksiyonu
-from tmdb_client import get_popular_movies_by_genres
+Girdi satırları {"text": "...", "id": ...} biçiminde JSON nesneleri ya da düz metin olabilir.
+Çıktı dosyası aynı zamanda kontrol noktasıdır: her sonuç kendi girdi satır numarasıyla yazılır ve
+hemen diske aktarılır. Çökme ya da kesinti sonrası aynı girdiyle --resume verilirse tamamlanan
+satırlar atlanır; "error" durumundaki satırlar (ör. geçici Gemini/TMDb kesintisi) yeniden denenir.
+Yeni sonuç dosyanın sonuna eklenir, aynı satır için son kayıt geçerlidir.
 
-# Ana program bloğu (doğrudan çalıştırıldığında devreye girer)
-if __name__ == "__main__":
-    # 🗣 Kullanıcıdan doğal dil ile film isteği al
-    user_input = input("Nasıl bir şey izlemek istersiniz? ")
-
-    # 🤖 Kullanıcı girdisini analiz et (Gemini LLM kullanılarak)
-    result = analyze_user_input(user_input)
+Çalıştırma: python main.py girdiler.jsonl -o sonuclar.jsonl [--concurrency 16] [--resume]
+           cat girdiler.jsonl | python main.py - -o sonuclar.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-    if result:
-        print("\nGemini analizi sonucu:", result)
+import llm_analyzer
+from recommender import find_movies
 
-        # 🔍 Çıktıdan türler ve anahtar kelimeleri ayıkla
-        turler = result.get("turler", [])
-        anahtar_kelimeler = result.get("anahtar_kelimeler", [])
+# Çıktıya yazılan öneri sayısı (puana göre ilk N film)
+DEFAULT_TOP = 10
+# Özette kullanılan gecikme adları
+LATENCY_LABELS = {"latency_ms": "toplam", "analysis_ms": "analiz", "discover_ms": "film bulma"}
 
-        # 🎬 TMDb API'den tür ve anahtar kelimelere göre film önerileri al
-        movies = get_popular_movies_by_genres(turler, anahtar_kelimeler)
 
-        if not movies:
-            print("\n❗ Belirtilen kriterlere uygun film bulunamadı!")
+def read_inputs(stream):
+    """(satır numarası, id, metin) üretir; boş satırlar atlanır ama numaralandırmaya dahildir."""
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        item_id = None
+        if line.startswith("{"):
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"⚠️ {line_no}. satır okunamadı, atlanıyor")
+                continue
+            item_id = data.get("id")
+            text = (data.get("text") or "").strip()
         else:
-            print("\n🎥 Film Önerileri:\n")
-            # İlk 5 filmi kullanıcıya göster
-            for movie in movies[:5]:
-                # Poster varsa URL'sini oluştur
-                poster_path = movie.get("poster_path")
-                poster_url = f"https://image.tmdb.org/t/p/w500{poster_path}" if poster_path else "Poster yok"
-
-                # Yayın yılını al (tarih yoksa 'Yıl Yok' yazsın)
-                year = (movie.get("release_date") or "Yıl Yok")[:4]
-
-                # 🎞️ Film bilgilerini yazdır
-                print(f"{movie['title']} ({year}) - Puan: {movie['vote_average']}")
-                print(f"Poster URL: {poster_url}")
-                print(f"Özet: {movie.get('overview')}\n")
-    else:
-        # LLM'den anlamlı bir çıktı alınamazsa kullanıcıyı bilgilendir
-        print("\n⚠️ Kullanıcı girdisi analiz edilemedi.")
+            text = line
+        if text:
+            yield line_no, item_id, text
+
+
+def load_checkpoint(path):
+    """
+    Önceki çalışmanın tamamlanan satır numaralarını okur. Çökme sırasında yarım yazılmış son
+    satır dosyadan kesilir, böylece devam eden çalışma temiz bir satır sonundan ekler.
+    Hatayla biten kayıtlar tamamlanmış sayılmaz; yeniden denenmeleri için kümeye eklenmez.
+    :return: tamamlanan satır numaraları kümesi
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    valid_size = 0
+    with open(path, "rb") as f:
+        for raw in f:
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                break
+            if not raw.endswith(b"\n"):
+                break
+            if record.get("status") == "error":
+                done.discard(record["line"])
+            else:
+                done.add(record["line"])
+            valid_size += len(raw)
+    if valid_size != os.path.getsize(path):
+        print(f"⚠️ Kontrol noktasındaki yarım kayıt kesildi ({path})")
+        with open(path, "r+b") as f:
+            f.truncate(valid_size)
+    return done
+
+
+def recommend(text, top):
+    """Tek bir girdi için analiz ve film bulma; aşama süreleriyle birlikte kayıt döndürür."""
+    record = {"turler": [], "anahtar_kelimeler": [], "movies": []}
+    start = time.perf_counter()
+    try:
+        result = llm_analyzer.analyze_user_input(text)
+        analyzed = time.perf_counter()
+        record["analysis_ms"] = round((analyzed - start) * 1000, 1)
+
+        genres = result.get("turler", [])
+        keywords = result.get("anahtar_kelimeler", [])
+        record["turler"] = genres
+        record["anahtar_kelimeler"] = keywords
+        if not genres:
+            record["status"] = "no_genres"
+            return record
+
+        movies = find_movies(genres, keywords) or []
+        record["discover_ms"] = round((time.perf_counter() - analyzed) * 1000, 1)
+        movies = sorted(movies, key=lambda m: m.get("vote_average") or 0, reverse=True)[:top]
+        record["movies"] = [
+            {"id": m["id"], "title": m.get("title"), "vote_average": m.get("vote_average")} for m in movies
+        ]
+        record["status"] = "ok" if movies else "no_movies"
+        return record
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = str(e)
+        return record
+    finally:
+        record["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+class Runner:
+    """
+    Girdileri sınırlı eşzamanlılıkla işler ve sonuçları tamamlandıkça yazar.
+    :param concurrency: aynı anda işlenen en fazla girdi
+    :param max_pending: okunup sırada bekleyebilecek en fazla girdi (bellek kullanımını sınırlar)
+    """
+
+    def __init__(self, output, concurrency, max_pending, top):
+        self.output = output
+        self.top = top
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bulk")
+        self._slots = threading.BoundedSemaphore(concurrency + max_pending)
+        self._write_lock = threading.Lock()
+        self.statuses = {}
+        self.latencies = {name: [] for name in LATENCY_LABELS}
+
+    def submit(self, line_no, item_id, text):
+        # Havuz doluysa okuma bekler; girdi dosyası ne kadar büyük olursa olsun bellekte sınırlı iş tutulur
+        self._slots.acquire()
+        try:
+            self._executor.submit(self._process, line_no, item_id, text)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _process(self, line_no, item_id, text):
+        try:
+            record = {"line": line_no, "id": item_id, "text": text, **recommend(text, self.top)}
+            line = json.dumps(record, ensure_ascii=False) + "\n"
+            with self._write_lock:
+                self.output.write(line)
+                self.output.flush()
+                self.statuses[record["status"]] = self.statuses.get(record["status"], 0) + 1
+                for name, values in self.latencies.items():
+                    if name in record:
+                        values.append(record[name])
+        finally:
+            self._slots.release()
+
+    def close(self, cancel=False):
+        """İşlenen girdilerin bitmesini bekler; cancel=True ise sırada bekleyenler iptal edilir."""
+        self._executor.shutdown(wait=True, cancel_futures=cancel)
+
+
+def print_summary(runner, skipped, elapsed):
+    processed = sum(runner.statuses.values())
+    print("\n📊 Özet")
+    print(f"işlenen: {processed}  atlanan (kontrol noktası): {skipped}  süre: {elapsed:.1f} s  "
+          f"verim: {processed / elapsed if elapsed else 0:.1f} girdi/s")
+    print("durumlar: " + ", ".join(f"{name}={count}" for name, count in sorted(runner.statuses.items())))
+    print("analiz aşamaları: " + ", ".join(f"{name}={count}" for name, count in llm_analyzer.stage_counts.items()))
+    print(f"{'gecikme':>12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'en fazla':>9}")
+    for name, values in runner.latencies.items():
+        if values:
+            print(f"{LATENCY_LABELS[name]:>12} {percentile(values, 0.5):>8.0f} {percentile(values, 0.95):>8.0f} "
+                  f"{percentile(values, 0.99):>8.0f} {max(values):>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ruh hali girdilerinden toplu film önerisi üretir")
+    parser.add_argument("input", nargs="?", default="-", help="JSONL girdi dosyası ('-' standart girdi)")
+    parser.add_argument("-o", "--output", required=True, help="JSONL çıktı dosyası (kontrol noktası)")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("BULK_CONCURRENCY", 16)),
+                        help="aynı anda işlenen en fazla girdi")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="okunup sırada bekleyebilecek en fazla girdi (varsayılan: eşzamanlılık kadar)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="girdi başına yazılan film sayısı")
+    parser.add_argument("--resume", action="store_true",
+                        help="çıktı dosyasındaki tamamlanmış satırları atlayıp kaldığı yerden devam et")
+    args = parser.parse_args()
+
+    done = load_checkpoint(args.output) if args.resume else set()
+    if done:
+        print(f"⏩ Kontrol noktasından devam: {len(done)} girdi zaten tamamlanmış")
+
+    stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output = open(args.output, "a" if args.resume else "w", encoding="utf-8")
+    max_pending = args.concurrency if args.max_pending is None else args.max_pending
+    runner = Runner(output, args.concurrency, max_pending, args.top)
+
+    skipped = 0
+    start = time.perf_counter()
+    try:
+        for line_no, item_id, text in read_inputs(stream):
+            if line_no in done:
+                skipped += 1
+                continue
+            runner.submit(line_no, item_id, text)
+        runner.close()
+    except KeyboardInterrupt:
+        # Bekleyen girdiler iptal edilir; yazılmış sonuçlar kontrol noktasında kalır
+        print("\n⏸ Yarıda kesildi; aynı komutu --resume ile çalıştırarak devam edebilirsiniz")
+        runner.close(cancel=True)
+    finally:
+        elapsed = time.perf_counter() - start
+        output.close()
+        if stream is not sys.stdin:
+            stream.close()
+
+    print_summary(runner, skipped, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+İstek bazında zamanlama ölçümü.
+- span("tmdb", "details") gibi bloklar süreyi hem isteğe ait listeye hem de histograma yazar
+- her yanıta Server-Timing başlığı eklenir (llm, tmdb, db, render, total)
+- /metrics uç noktası Prometheus metin formatında histogramları ve önbellek/havuz sayaçlarını verir
+- PROFILING_ENABLED=1 iken ?profile=1 ile istenen (veya PROFILE_SAMPLE_RATE oranında rastgele seçilen)
+  istekler örnekleyici profiler ile izlenir; yığınlar PROFILE_DIR altına "folded" biçimde yazılır
+"""
+import contextvars
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Saniye cinsinden histogram sınırları
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", 0.005))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._series = {}  # etiket değerleri -> [bucket sayaçları, toplam, adet]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(BUCKETS), 0.0, 0]
+            for i, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+            for labels, (buckets, total, count) in items:
+                label_text = ",".join(f'{name}="{value}"' for name, value in zip(self.label_names, labels))
+                for bound, bucket_count in zip(BUCKETS, buckets):
+                    lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {bucket_count}')
+                lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {count}')
+                lines.append(f"{self.name}_sum{{{label_text}}} {total:.6f}")
+                lines.append(f"{self.name}_count{{{label_text}}} {count}")
+        return lines
+
+
+span_seconds = Histogram("moodflix_span_seconds", "Süre (LLM, TMDb, DB, şablon)", ("kind", "name"))
+request_seconds = Histogram("moodflix_request_seconds", "HTTP istek süresi", ("endpoint", "method", "status"))
+
+# İsteğe ait (tür, ad, süre) listesi; istek dışındaki çağrılarda None
+_current_spans = contextvars.ContextVar("current_spans", default=None)
+
+
+@contextmanager
+def span(kind, name=""):
+    """Bloğun süresini ölçer: with span("db", "execute"): ..."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        span_seconds.observe((kind, name), elapsed)
+        spans = _current_spans.get()
+        if spans is not None:
+            spans.append((kind, name, elapsed))
+
+
+def submit(executor, fn, *args):
+    """
+    executor.submit yerine kullanılır: iş parçacığı havuzunda çalışan işin süreleri de
+    başlatan isteğin Server-Timing değerlerine eklenir.
+    """
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+class SamplingProfiler:
+    """Tek bir iş parçacığının yığınını belirli aralıklarla örnekler (py-spy benzeri, düşük maliyetli)."""
+
+    def __init__(self, thread_id, interval=PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, label):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        safe_label = "".join(ch if ch.isalnum() else "_" for ch in label)
+        path = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{safe_label}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+def server_timing(spans, total):
+    """
+    Span'leri türe göre toplayıp Server-Timing başlık değerini üretir.
+    Paralel çalışan span'ler (ör. favori detayları) toplandığı için bir tür total'den büyük olabilir.
+    """
+    totals = {}
+    for kind, _, elapsed in spans:
+        totals[kind] = totals.get(kind, 0.0) + elapsed
+    parts = [f"{kind};dur={elapsed * 1000:.1f}" for kind, elapsed in totals.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def init_app(app, collectors=()):
+    """
+    Flask uygulamasına zamanlama kancalarını ve /metrics uç noktasını ekler.
+    :param collectors: Prometheus satırları döndüren ek fonksiyonlar (önbellek, havuz sayaçları)
+    """
+    from flask import Response, g, request, template_rendered, before_render_template
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_start = time.perf_counter()
+        g.metrics_token = _current_spans.set([])
+        g.metrics_templates = {}
+        profile_requested = request.args.get("profile") == "1" or request.headers.get("X-Profile") == "1"
+        if PROFILING_ENABLED and (profile_requested or random.random() < PROFILE_SAMPLE_RATE):
+            g.profiler = SamplingProfiler(threading.get_ident()).start()
+
+    def _template_started(sender, template, context, **extra):
+        g.metrics_templates[template.name] = time.perf_counter()
+
+    def _template_finished(sender, template, context, **extra):
+        start = g.metrics_templates.pop(template.name, None)
+        if start is not None:
+            elapsed = time.perf_counter() - start
+            span_seconds.observe(("render", template.name), elapsed)
+            spans = _current_spans.get()
+            if spans is not None:
+                spans.append(("render", template.name, elapsed))
+
+    before_render_template.connect(_template_started, app, weak=False)
+    template_rendered.connect(_template_finished, app, weak=False)
+
+    @app.after_request
+    def _finish_timer(response):
+        start = g.pop("metrics_start", None)
+        if start is None:
+            return response
+        total = time.perf_counter() - start
+        spans = _current_spans.get() or []
+        response.headers["Server-Timing"] = server_timing(spans, total)
+        request_seconds.observe((request.endpoint or "unknown", request.method, str(response.status_code)), total)
+
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.stop()
+            response.headers["X-Profile-File"] = profiler.write(request.endpoint or "unknown")
+        return response
+
+    @app.teardown_request
+    def _reset_spans(exc):
+        token = g.pop("metrics_token", None)
+        if token is not None:
+            _current_spans.reset(token)
+
+    @app.route("/metrics")
+    def metrics_endpoint():
+        lines = span_seconds.render() + request_seconds.render()
+        for collector in collectors:
+            try:
+                lines += collector()
+            except Exception as e:
+                lines.append(f"# collector error: {e}")
+        return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+
+def gauge_lines(name, help_text, values, label_name=None):
+    """
+    Sayaç/gösterge değerlerini Prometheus satırlarına çevirir.
+    :param values: {etiket değeri: sayı} (label_name verilirse) veya tek bir sayı
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    if label_name is None:
+        lines.append(f"{name} {values}")
+    else:
+        for label, value in sorted(values.items()):
+            lines.append(f'{name}{{{label_name}="{label}"}} {value}')
+    return lines
+
+
+def cache_lines(stats_list):
+    """TTLCache.stats() çıktılarını önbellek adına göre etiketlenmiş Prometheus satırlarına çevirir."""
+    lines = []
+    for counter in ("hits", "disk_hits", "misses", "evictions", "expirations", "stale_hits"):
+        name = f"moodflix_cache_{counter}_total"
+        lines += [f"# HELP {name} Önbellek sayacı ({counter})", f"# TYPE {name} counter"]
+        lines += [f'{name}{{cache="{stats["name"]}"}} {stats[counter]}' for stats in stats_list]
+    lines += gauge_lines("moodflix_cache_size", "Önbellekteki kayıt sayısı",
+                         {stats["name"]: stats["size"] for stats in stats_list}, "cache")
+    return lines
@@ -0,0 +1,176 @@
+"""
+Gemini'ye gitmeden önce çalışan, sözlük tabanlı hızlı ruh hali sınıflandırıcısı.
+Girdideki kelimeler Türkçe kök listesiyle eşleştirilir ve türler için puan toplanır.
+"""
+import re
+import unicodedata
+
+# Gemini isteminde de kullanılan tür listesi
+GENRE_LABELS = ["Aksiyon", "Komedi", "Dram", "Korku", "Bilim Kurgu", "Romantik", "Macera"]
+
+# kök -> ({tür: ağırlık}, anahtar kelime)
+LEXICON = {
+    # Hüzün / duygusallık
+    "hüzün": ({"Dram": 1.0}, "hüzün"),
+    "üzgün": ({"Dram": 1.0}, "hüzün"),
+    "üzül": ({"Dram": 1.0}, "hüzün"),
+    "mutsuz": ({"Dram": 1.0}, "mutsuzluk"),
+    "ağla": ({"Dram": 1.0}, "duygusal"),
+    "duygusal": ({"Dram": 0.8, "Romantik": 0.4}, "duygusal"),
+    "yalnız": ({"Dram": 0.8, "Romantik": 0.3}, "yalnızlık"),
+    "kırgın": ({"Dram": 0.8}, "kırgınlık"),
+    "depresif": ({"Dram": 1.0}, "hüzün"),
+    "karamsar": ({"Dram": 0.9}, "hüzün"),
+    "özle": ({"Dram": 0.7, "Romantik": 0.5}, "özlem"),
+    "dram": ({"Dram": 1.0}, "dram"),
+    # Yorgunluk / rahatlama
+    "yorgun": ({"Komedi": 0.6, "Dram": 0.3}, "yorgunluk"),
+    "bitkin": ({"Komedi": 0.6, "Dram": 0.3}, "yorgunluk"),
+    "stres": ({"Komedi": 0.8}, "stres"),
+    "gergin": ({"Komedi": 0.7}, "stres"),
+    "rahatla": ({"Komedi": 0.9}, "rahatlama"),
+    "kafa dağıt": ({"Komedi": 1.0}, "rahatlama"),
+    "sıkıl": ({"Komedi": 0.6, "Macera": 0.5}, "sıkıntı"),
+    "canım sıkkın": ({"Komedi": 0.8}, "sıkıntı"),
+    # Neşe
+    "mutlu": ({"Komedi": 1.0}, "mutluluk"),
+    "neşe": ({"Komedi": 1.0}, "neşe"),
+    "gül": ({"Komedi": 1.0}, "kahkaha"),
+    "kahkaha": ({"Komedi": 1.0}, "kahkaha"),
+    "komik": ({"Komedi": 1.0}, "komedi"),
+    "komedi": ({"Komedi": 1.0}, "komedi"),
+    "eğlen": ({"Komedi": 0.9, "Macera": 0.3}, "eğlence"),
+    "keyif": ({"Komedi": 0.7}, "keyif"),
+    # Korku
+    "kork": ({"Korku": 1.0}, "korku"),
+    "korku": ({"Korku": 1.0}, "korku"),
+    "ürper": ({"Korku": 1.0}, "ürpertici"),
+    "hayalet": ({"Korku": 1.0}, "hayalet"),
+    "zombi": ({"Korku": 1.0}, "zombi"),
+    "vampir": ({"Korku": 1.0}, "vampir"),
+    "cin": ({"Korku": 0.9}, "doğaüstü"),
+    "lanet": ({"Korku": 0.8}, "lanet"),
+    "kabus": ({"Korku": 0.9}, "kabus"),
+    # Aksiyon / enerji
+    "aksiyon": ({"Aksiyon": 1.0}, "aksiyon"),
+    "heyecan": ({"Aksiyon": 0.8, "Macera": 0.5}, "heyecan"),
+    "adrenalin": ({"Aksiyon": 1.0}, "adrenalin"),
+    "enerji": ({"Aksiyon": 0.8}, "enerji"),
+    "sinirli": ({"Aksiyon": 0.9}, "öfke"),
+    "öfke": ({"Aksiyon": 0.9}, "öfke"),
+    "kızgın": ({"Aksiyon": 0.9}, "öfke"),
+    "dövüş": ({"Aksiyon": 1.0}, "dövüş"),
+    "kavga": ({"Aksiyon": 0.9}, "dövüş"),
+    "patlama": ({"Aksiyon": 1.0}, "patlama"),
+    "savaş": ({"Aksiyon": 0.9, "Dram": 0.3}, "savaş"),
+    "kovala": ({"Aksiyon": 0.9}, "kovalamaca"),
+    # Macera
+    "macera": ({"Macera": 1.0}, "macera"),
+    "keşf": ({"Macera": 1.0}, "keşif"),
+    "keşif": ({"Macera": 1.0}, "keşif"),
+    "yolculuk": ({"Macera": 1.0}, "yolculuk"),
+    "seyahat": ({"Macera": 0.9}, "yolculuk"),
+    "tatil": ({"Macera": 0.6, "Komedi": 0.4}, "tatil"),
+    "hazine": ({"Macera": 1.0}, "hazine"),
+    "orman": ({"Macera": 0.7}, "doğa"),
+    "ada": ({"Macera": 0.6}, "ada"),  # sadece tam kelime ("adam" eşleşmez), bkz. WHOLE_WORD_STEMS
+    # Bilim kurgu
+    "uzay": ({"Bilim Kurgu": 1.0}, "uzay"),
+    "gezegen": ({"Bilim Kurgu": 1.0}, "uzay"),
+    "robot": ({"Bilim Kurgu": 1.0}, "robot"),
+    "yapay zeka": ({"Bilim Kurgu": 1.0}, "yapay zeka"),
+    "gelecek": ({"Bilim Kurgu": 0.8}, "gelecek"),
+    "zaman yolculu": ({"Bilim Kurgu": 1.0}, "zaman yolculuğu"),
+    "uzaylı": ({"Bilim Kurgu": 1.0}, "uzaylı"),
+    "bilim": ({"Bilim Kurgu": 0.9}, "bilim"),
+    "distopya": ({"Bilim Kurgu": 1.0}, "distopya"),
+    # Romantik
+    "aşk": ({"Romantik": 1.0}, "aşk"),
+    "aşık": ({"Romantik": 1.0}, "aşk"),
+    "aşığ": ({"Romantik": 1.0}, "aşk"),  # aşığım, aşığı
+    "sevgi": ({"Romantik": 1.0}, "sevgi"),
+    "sevgili": ({"Romantik": 1.0}, "ilişki"),
+    "romantik": ({"Romantik": 1.0}, "romantik"),
+    "romantizm": ({"Romantik": 1.0}, "romantik"),
+    "kalbim": ({"Romantik": 0.8, "Dram": 0.3}, "kalp"),
+    "evlilik": ({"Romantik": 0.8}, "evlilik"),
+    "ayrıl": ({"Dram": 0.8, "Romantik": 0.5}, "ayrılık"),
+    "flört": ({"Romantik": 1.0}, "flört"),
+}
+
+# Yaygın kelimelerin başı olan kökler sadece tam kelime olarak eşleşir (ada -> adam, adalet)
+WHOLE_WORD_STEMS = {"ada"}
+
+# Olumsuzluk içeren girdiler ("korku istemiyorum") sözlükle güvenilir biçimde çözülemez
+NEGATIONS = ("değil", "istemiyorum", "istemem", "olmasın", "hariç", "dışında", "sevmem", "sevmiyorum")
+
+
+def normalize_input(text):
+    """
+    Önbellek anahtarı için girdiyi normalleştirir:
+    Türkçe'ye uygun küçük harfe çevirme (I -> ı, İ -> i), noktalama işaretlerini
+    ve fazla boşlukları kaldırma.
+    "Yorgunum  ve HÜZÜNLÜYÜM!" ve "yorgunum ve hüzünlüyüm" aynı anahtarı üretir.
+    """
+    text = unicodedata.normalize("NFC", text or "")
+    text = text.replace("I", "ı").replace("İ", "i").lower()
+    text = "".join(" " if unicodedata.category(ch).startswith(("P", "S")) else ch for ch in text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+_MULTIWORD = sorted((stem for stem in LEXICON if " " in stem), key=len, reverse=True)
+_SINGLE = sorted((stem for stem in LEXICON if " " not in stem), key=len, reverse=True)
+
+
+def _match_tokens(text):
+    """Normalleştirilmiş metindeki sözlük köklerini döndürür (her token en uzun köke eşlenir)."""
+    matches = []
+    for phrase in _MULTIWORD:
+        if phrase in text:
+            matches.append(phrase)
+            text = text.replace(phrase, " ")
+    for token in text.split():
+        for stem in _SINGLE:
+            if stem in WHOLE_WORD_STEMS and token != stem:
+                continue
+            # Kısa kökler (cin, ada, gül) sadece tam kelime veya yaygın eklerle eşleşsin
+            if token.startswith(stem) and (len(stem) >= 4 or len(token) - len(stem) <= 3):
+                matches.append(stem)
+                break
+    return matches
+
+
+def classify(user_input):
+    """
+    Girdiyi sözlükle sınıflandırır.
+    :return: {"turler": [...], "anahtar_kelimeler": [...], "guven": 0-1 arası güven puanı}
+    """
+    text = normalize_input(user_input)
+    tokens = text.split()
+    matches = _match_tokens(text)
+
+    scores = {}
+    keywords = []
+    for stem in matches:
+        weights, keyword = LEXICON[stem]
+        for genre, weight in weights.items():
+            scores[genre] = scores.get(genre, 0.0) + weight
+        if keyword not in keywords:
+            keywords.append(keyword)
+
+    if not scores:
+        return {"turler": [], "anahtar_kelimeler": [], "guven": 0.0}
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    top_score = ranked[0][1]
+    genres = [genre for genre, score in ranked if score >= top_score * 0.5][:3]
+
+    # Güven: kaç kelimenin açıklandığı ve baskın türün ne kadar net olduğu
+    evidence = min(1.0, top_score / 1.5)
+    coverage = min(1.0, len(matches) / max(1.0, len(tokens) / 3))
+    margin = top_score / sum(scores.values())
+    confidence = evidence * (0.5 + 0.5 * coverage) * (0.6 + 0.4 * margin)
+    if any(re.search(rf"\b{neg}", text) for neg in NEGATIONS):
+        confidence *= 0.3
+
+    return {"turler": genres, "anahtar_kelimeler": keywords, "guven": round(confidence, 3)}
@@ -0,0 +1,181 @@
+"""
+Şifre özetleme (bcrypt) işlemleri.
+bcrypt bilerek yavaş ve CPU yoğun bir işlemdir; istek iş parçacıklarında çalıştırıldığında yoğun bir
+giriş anında diğer tüm rotaları bekletir. Bu yüzden özetleme ve doğrulama, boyutu sınırlı ayrı bir
+süreç havuzunda (gerçek çok çekirdekli paralellik) yapılır. Havuzda bekleyen iş sayısı sınırlıdır;
+sınır doluysa yeni istek kısa bir süre bekler, yine yer açılmazsa HasherBusy fırlatılır.
+
+Maliyet (work factor) BCRYPT_ROUNDS ile verilebilir; verilmezse tek doğrulamanın yaklaşık
+BCRYPT_TARGET_MS sürmesini sağlayacak değer ölçülerek seçilir. Maliyeti güncel değerden düşük
+olan eski özetler başarılı girişte yeni maliyetle yeniden üretilir (bkz. needs_rehash); özetler
+hiçbir zaman daha düşük maliyete indirilmez.
+"""
+import atexit
+import math
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+import metrics
+
+BCRYPT_ROUNDS = os.getenv("BCRYPT_ROUNDS")  # boşsa otomatik ayarlanır
+BCRYPT_TARGET_MS = float(os.getenv("BCRYPT_TARGET_MS", 250))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", os.cpu_count() or 1))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", HASH_WORKERS * 4))
+HASH_QUEUE_TIMEOUT = float(os.getenv("HASH_QUEUE_TIMEOUT", 2))
+
+# Otomatik ayarda izin verilen maliyet aralığı (10'un altı güvenli kabul edilmez)
+MIN_AUTO_ROUNDS = 10
+MAX_AUTO_ROUNDS = 16
+# Ölçüm bu maliyetle yapılır, hedefe göre logaritmik olarak ölçeklenir (her +1 süreyi ikiye katlar)
+CALIBRATION_ROUNDS = 8
+
+
+class HasherBusy(Exception):
+    """Özetleme kuyruğu dolu olduğunda fırlatılır; istek 503 ile reddedilebilir."""
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+def _verify(password, password_hash):
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+    except ValueError:
+        # Bozuk / bcrypt olmayan özet
+        return False
+
+
+def hash_rounds(password_hash):
+    """Özetin içindeki maliyet değeri ($2b$12$... -> 12); okunamazsa None."""
+    try:
+        return int(password_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def calibrate(target_ms=BCRYPT_TARGET_MS, samples=3):
+    """
+    Tek özetlemenin yaklaşık target_ms sürmesi için gereken maliyeti ölçerek bulur.
+    :return: MIN_AUTO_ROUNDS ile MAX_AUTO_ROUNDS arasında maliyet değeri
+    """
+    salt = bcrypt.gensalt(rounds=CALIBRATION_ROUNDS)
+    elapsed = min(_timed_hash(salt) for _ in range(samples))
+    rounds = CALIBRATION_ROUNDS + round(math.log2(max(target_ms / 1000, 1e-6) / elapsed))
+    return max(MIN_AUTO_ROUNDS, min(MAX_AUTO_ROUNDS, rounds))
+
+
+def _timed_hash(salt):
+    start = time.perf_counter()
+    bcrypt.hashpw(b"calibration-password", salt)
+    return time.perf_counter() - start
+
+
+class PasswordHasher:
+    """
+    bcrypt işlerini süreç havuzunda çalıştırır.
+    :param workers: süreç sayısı; 0 verilirse işler çağıran iş parçacığında çalışır
+    :param max_pending: havuzda aynı anda bekleyebilecek en fazla iş (geri basınç sınırı)
+    :param rounds: bcrypt maliyeti; None ise ilk kullanımda calibrate() ile belirlenir
+    """
+
+    def __init__(self, workers=HASH_WORKERS, max_pending=HASH_MAX_PENDING, rounds=None,
+                 queue_timeout=HASH_QUEUE_TIMEOUT):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._rounds = rounds
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def rounds(self):
+        if self._rounds is None:
+            with self._lock:
+                if self._rounds is None:
+                    self._rounds = calibrate()
+                    print(f"🔐 bcrypt maliyeti otomatik ayarlandı: {self._rounds}")
+        return self._rounds
+
+    def _get_executor(self):
+        # Süreçler ilk kullanımda başlatılır (uygulama açılışı yavaşlamasın)
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _run(self, fn, *args):
+        if self.workers == 0:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self.rejected += 1
+            raise HasherBusy(f"{self.max_pending} özetleme işi zaten bekliyor")
+        with self._lock:
+            self.pending += 1
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+            self._slots.release()
+
+    def hash_password(self, password):
+        """Şifreyi güncel maliyetle özetler ve metin olarak döndürür."""
+        rounds = self.rounds
+        with metrics.span("bcrypt", "hash"):
+            return self._run(_hash, password, rounds)
+
+    def check_password(self, password_hash, password):
+        """Şifre özetle eşleşiyorsa True döner."""
+        with metrics.span("bcrypt", "verify"):
+            return self._run(_verify, password, password_hash)
+
+    def needs_rehash(self, password_hash):
+        """
+        Özet güncel maliyetten düşük bir maliyetle üretilmişse True döner.
+        Otomatik ayarda maliyet her süreçte yük altında ölçüldüğü için süreçler arasında farklı
+        çıkabilir; daha yüksek maliyetli özetler düşürülmez, süreçler aynı hesabı gidip gelerek yenilemez.
+        """
+        return hash_rounds(password_hash) < self.rounds
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hasher = PasswordHasher(rounds=int(BCRYPT_ROUNDS) if BCRYPT_ROUNDS else None)
+atexit.register(hasher.shutdown)
+
+
+def hash_password(password):
+    return hasher.hash_password(password)
+
+
+def check_password(password_hash, password):
+    return hasher.check_password(password_hash, password)
+
+
+def needs_rehash(password_hash):
+    return hasher.needs_rehash(password_hash)
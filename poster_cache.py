@@ -0,0 +1,202 @@
+"""
+TMDb afişleri için yerel vekil (proxy) ve disk önbelleği.
+Sayfalar afişleri doğrudan image.tmdb.org'dan değil /poster/<boyut>/<dosya> üzerinden ister;
+her afiş (boyut, dosya) başına bir kez indirilir ve diskte saklanır. Önbellek toplam boyutla
+sınırlıdır, sınır aşılınca en uzun süredir kullanılmayan (LRU) afişler silinir.
+
+- TMDb afiş yolları içeriğe özgüdür (afiş değişirse yol da değişir); bu yüzden yanıtlar uzun süre
+  önbelleklenebilir ve ETag yoldan türetilir, koşullu istekler diske bile gitmeden 304 alır
+- Aynı afiş için eşzamanlı gelen istekler tek bir TMDb indirmesini bekler
+"""
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import metrics
+import resilience
+import tmdb_client
+
+POSTER_BASE_URL = os.getenv("POSTER_BASE_URL", "https://image.tmdb.org/t/p").rstrip("/")
+POSTER_CACHE_DIR = os.getenv("POSTER_CACHE_DIR", "poster_cache")
+POSTER_CACHE_MAX_MB = float(os.getenv("POSTER_CACHE_MAX_MB", 200))
+# Tarayıcı ve ara önbelleklerin afişi saklayabileceği süre (saniye)
+POSTER_MAX_AGE = int(os.getenv("POSTER_MAX_AGE", 30 * 24 * 3600))
+POSTER_FETCH_TIMEOUT = 10
+
+# Sadece sayfaların kullandığı TMDb boyutları vekillenir (rastgele boyutlarla önbellek şişirilemesin)
+SIZES = ("w92", "w154", "w185", "w300", "w342", "w500")
+FILENAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]+\.(jpg|jpeg|png|webp)$")
+CONTENT_TYPES = {"jpg": "image/jpeg", "jpeg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
+
+
+class PosterCache:
+    """
+    :param directory: afişlerin saklandığı klasör (boyut başına alt klasör)
+    :param max_bytes: diskteki toplam afiş boyutu sınırı
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # (boyut, dosya) -> bayt; en eski kullanılan başta
+        self._total_bytes = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        # Aynı afişi bekleyen istekler tek indirmeyi paylaşır; görüntü sunucusu sağlıksızsa hemen reddedilir
+        self._flight = resilience.SingleFlight()
+        self._breaker = resilience.CircuitBreaker("tmdb_image")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.failures = 0
+
+    def _path(self, size, filename):
+        return os.path.join(self.directory, size, filename)
+
+    def _load(self):
+        """Diskteki afişleri son kullanım (mtime) sırasıyla indekse alır; ilk kullanımda bir kez çalışır."""
+        found = []
+        for size in SIZES:
+            folder = os.path.join(self.directory, size)
+            if not os.path.isdir(folder):
+                continue
+            for entry in os.scandir(folder):
+                if entry.is_file() and FILENAME_PATTERN.match(entry.name):
+                    stat = entry.stat()
+                    found.append((stat.st_mtime, (size, entry.name), stat.st_size))
+        for _, key, nbytes in sorted(found):
+            self._entries[key] = nbytes
+            self._total_bytes += nbytes
+        self._loaded = True
+        self._evict()
+
+    def _evict(self):
+        # Kilit çağıran tarafından tutulmalı
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            (size, filename), nbytes = self._entries.popitem(last=False)
+            self._total_bytes -= nbytes
+            self.evictions += 1
+            try:
+                os.remove(self._path(size, filename))
+            except OSError:
+                pass
+
+    def _read(self, key):
+        """Diskteki afişi okur ve LRU sırasını günceller; yoksa None."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        path = self._path(*key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # Son kullanım zamanı yeniden başlatmadan sonra LRU sırası için dosyada tutulur
+            os.utime(path)
+            return data
+        except OSError:
+            # Başka bir istek tarafından silinmiş olabilir
+            with self._lock:
+                nbytes = self._entries.pop(key, None)
+                if nbytes is not None:
+                    self._total_bytes -= nbytes
+            return None
+
+    def _store(self, key, data):
+        path = self._path(*key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Önce geçici dosyaya yazılır; okuyucular hiçbir zaman yarım dosya görmez
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._total_bytes += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._evict()
+
+    def _request(self, size, filename):
+        import requests
+        try:
+            response = tmdb_client.get_session().get(f"{POSTER_BASE_URL}/{size}/{filename}",
+                                                     timeout=resilience.timeout_for(POSTER_FETCH_TIMEOUT))
+        except requests.RequestException as e:
+            raise resilience.RetryableError(f"Afiş isteği başarısız: {e}") from e
+        if response.status_code == 429 or response.status_code >= 500:
+            raise resilience.RetryableError(
+                f"Görüntü sunucusu hatası ({response.status_code})",
+                retry_after=resilience.parse_retry_after(response.headers.get("Retry-After")))
+        return response
+
+    def _fetch(self, size, filename):
+        with metrics.span("tmdb", "poster"):
+            response = resilience.call(self._breaker, self._request, size, filename)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        data = response.content
+        self._store((size, filename), data)
+        return data
+
+    def get(self, size, filename):
+        """
+        Afişin baytlarını döndürür; önbellekte yoksa TMDb'den indirip saklar.
+        :return: bayt dizisi ya da afiş TMDb'de yoksa None
+        :raises: TMDb'ye ulaşılamazsa ilgili istek hatası
+        """
+        key = (size, filename)
+        data = self._read(key)
+        if data is not None:
+            with self._lock:
+                self.hits += 1
+            return data
+
+        with self._lock:
+            self.misses += 1
+        try:
+            return self._flight.do(key, self._fetch, size, filename)
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            raise
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self._flight.coalesced,
+                "evictions": self.evictions,
+                "failures": self.failures,
+            }
+
+
+cache = PosterCache(POSTER_CACHE_DIR, int(POSTER_CACHE_MAX_MB * 1024 * 1024))
+
+
+def is_valid(size, filename):
+    return size in SIZES and FILENAME_PATTERN.match(filename) is not None
+
+
+def content_type(filename):
+    return CONTENT_TYPES[filename.rsplit(".", 1)[1].lower()]
+
+
+def etag(size, filename):
+    """Yol içeriğe özgü olduğu için ETag dosyayı okumadan üretilir."""
+    return hashlib.sha1(f"{size}/{filename}".encode("utf-8")).hexdigest()[:16]
+
+
+def get(size, filename):
+    return cache.get(size, filename)
+
+
+def stats():
+    return cache.stats()
@@ -0,0 +1,110 @@
+"""
+Asenkron öneri işleri.
+/recommend/async isteği bir iş kimliği döndürüp hemen yanıtlanır; öneri akışı sınırlı bir
+iş parçacığı havuzunda çalışır ve her adımın sonucu iş kaydına olay olarak eklenir.
+Tarayıcı /recommend/stream/<job_id> üzerinden bu olayları Server-Sent Events ile okur.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import recommender
+import resilience
+
+RECOMMEND_WORKERS = int(os.getenv("RECOMMEND_WORKERS", 8))
+# Tamamlanan işler bu süre sonra silinir (yeniden bağlanan tarayıcılar için kısa bir süre tutulur)
+JOB_TTL = 300
+# Olay beklenirken bağlantıyı canlı tutmak için gönderilen yorum satırı aralığı
+KEEPALIVE_INTERVAL = 15
+# İşi bitiren olaylar; hata olayı "failed" adını taşır çünkü EventSource'un kendi "error" olayı
+# bağlantı kopmasını bildirir ve tarayıcı o durumda Last-Event-ID ile yeniden bağlanmalıdır
+FINAL_EVENTS = ("done", "failed")
+
+_executor = ThreadPoolExecutor(max_workers=RECOMMEND_WORKERS, thread_name_prefix="recommend")
+
+
+class Job:
+    def __init__(self, user_id):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.created_at = time.monotonic()
+        self.events = []  # (olay adı, veri)
+        self.done = False
+        self._cond = threading.Condition()
+
+    def emit(self, event, data):
+        with self._cond:
+            self.events.append((event, data))
+            if event in FINAL_EVENTS:
+                self.done = True
+            self._cond.notify_all()
+
+    def wait_events(self, start, timeout):
+        """start indeksinden itibaren yeni olayları bekler; süre dolarsa boş liste döner."""
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.events) > start or self.done, timeout)
+            return self.events[start:]
+
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def _cleanup():
+    now = time.monotonic()
+    with _jobs_lock:
+        for job_id in [job_id for job_id, job in _jobs.items() if now - job.created_at > JOB_TTL]:
+            del _jobs[job_id]
+
+
+def _run(job, user_input):
+    # İş, isteğin dışında çalıştığı için kendi süre bütçesini alır
+    with resilience.budget(resilience.REQUEST_BUDGET):
+        top_movie, other_movies, error = recommender.run(job.user_id, user_input, emit=job.emit)
+    if error:
+        job.emit("failed", {"message": error})
+    else:
+        job.emit("done", {})
+
+
+def start(user_id, user_input):
+    """Yeni bir öneri işi başlatır ve işi döndürür."""
+    _cleanup()
+    job = Job(user_id)
+    with _jobs_lock:
+        _jobs[job.id] = job
+    _executor.submit(_run, job, user_input)
+    return job
+
+
+def get(job_id, user_id):
+    """İşi döndürür; yoksa veya başka kullanıcıya aitse None."""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is None or job.user_id != user_id:
+        return None
+    return job
+
+
+def sse_stream(job, last_event_id=None):
+    """
+    İş olaylarını text/event-stream biçiminde üretir.
+    Olay kimliği olay sırasıdır; tarayıcı yeniden bağlanırsa Last-Event-ID'den devam edilir.
+    """
+    index = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+    yield "retry: 2000\n\n"
+    while True:
+        events = job.wait_events(index, KEEPALIVE_INTERVAL)
+        if not events:
+            if job.done:
+                return
+            yield ": keepalive\n\n"
+            continue
+        for event, data in events:
+            yield f"id: {index}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+            index += 1
+            if event in FINAL_EVENTS:
+                return
@@ -0,0 +1,251 @@
+"""
+Öneri geçmişinin (Recommendations tablosu) kaydedilmesi.
+Satırlar tek bir toplu INSERT ile yazılır; RECOMMENDATION_WRITE_BEHIND açıksa yazma işi
+arka plandaki bir kuyruğa bırakılır ve /recommend yanıtı veritabanını beklemez. Kuyruğun iş parçacığı
+fork'tan sağ çıkmadığı için her süreçte ilk kayıtta oluşturulur; o süreçte çalışan bir yazıcı
+yoksa satırlar senkron yazılır.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from itertools import groupby
+
+from db import get_connection, pool
+
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", 100))
+
+INSERT_SQL = """
+    INSERT INTO Recommendations (UserId, QuestionText, RecommendedMovie, RecommendedMovieId)
+    VALUES (?, ?, ?, ?)
+"""
+
+
+def save_rows(rows):
+    """Satırları tek bir executemany çağrısıyla yazar."""
+    if not rows:
+        return
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        if pool.dialect == "sqlserver":
+            # pyodbc parametre dizisini tek seferde gönderir (satır başına gidiş-dönüş yok)
+            cursor.fast_executemany = True
+        cursor.executemany(INSERT_SQL, rows)
+        conn.commit()
+
+
+class WriteBehindQueue:
+    """
+    Sınırlı kapasiteli arka plan yazma kuyruğu.
+    Satırlar batch_size'a ulaşınca ya da flush_interval saniye geçince toplu olarak yazılır.
+    :param flush: satır listesini kalıcı hale getiren fonksiyon
+    :param max_pending: kuyrukta bekleyebilecek en fazla satır; dolunca submit() False döner
+    """
+
+    def __init__(self, flush, batch_size=200, flush_interval=1.0, max_pending=10000):
+        self.flush = flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stopping = threading.Event()
+        self._submit_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        self.flushed_rows = 0
+        self.failed_rows = 0
+
+    def submit(self, rows):
+        """Satırları kuyruğa ekler; kuyruk doluysa, kapanıyorsa veya yazıcı bu süreçte çalışmıyorsa False döner."""
+        if self._stopping.is_set() or not self._thread.is_alive():
+            return False
+        # Bir analizin satırları ya tamamen kuyruğa girer ya hiç girmez
+        with self._submit_lock:
+            if self._queue.maxsize - self._queue.qsize() < len(rows):
+                return False
+            for row in rows:
+                self._queue.put_nowait(row)
+        return True
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                pass
+
+            stopping = self._stopping.is_set()
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline or stopping:
+                if stopping:
+                    # Kapanışta kuyrukta kalan her şeyi al
+                    while True:
+                        try:
+                            batch.append(self._queue.get_nowait())
+                        except queue.Empty:
+                            break
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+                if stopping:
+                    return
+
+    def _flush(self, batch):
+        for start in range(0, len(batch), self.batch_size):
+            chunk = batch[start:start + self.batch_size]
+            try:
+                self.flush(chunk)
+                self.flushed_rows += len(chunk)
+            except Exception as e:
+                self.failed_rows += len(chunk)
+                print(f"❌ Öneri geçmişi yazılamadı ({len(chunk)} satır):", e)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def shutdown(self, timeout=10.0):
+        """Kuyruğu boşaltır ve arka plan iş parçacığını durdurur."""
+        self._stopping.set()
+        self._thread.join(timeout)
+
+
+WRITE_BEHIND_ENABLED = os.getenv("RECOMMENDATION_WRITE_BEHIND", "0") == "1"
+
+# Yazıcı, sahibi olan sürecin PID'siyle birlikte tutulur; fork sonrası çocukta yeniden oluşturulur
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """Bu sürecin arka plan yazıcısı; write-behind kapalıysa None."""
+    global _writer, _writer_pid
+    if not WRITE_BEHIND_ENABLED:
+        return None
+    if _writer_pid != os.getpid():
+        with _writer_lock:
+            if _writer_pid != os.getpid():
+                _writer = WriteBehindQueue(
+                    save_rows,
+                    batch_size=int(os.getenv("RECOMMENDATION_BATCH_SIZE", 200)),
+                    flush_interval=float(os.getenv("RECOMMENDATION_FLUSH_INTERVAL", 1.0)),
+                )
+                _writer_pid = os.getpid()
+    return _writer
+
+
+def _shutdown_writer():
+    # atexit kaydı fork ile çocuğa da geçer; sadece bu sürecin yazıcısı boşaltılır
+    if _writer is not None and _writer_pid == os.getpid():
+        _writer.shutdown()
+
+
+atexit.register(_shutdown_writer)
+
+
+def record_recommendations(user_id, question_text, movies):
+    """
+    Bir analiz sonucunda önerilen filmleri geçmişe kaydeder.
+    Arka plan kuyruğu açıksa ve doluysa yazma senkron yapılır (veri kaybolmaz).
+    """
+    rows = [(user_id, question_text, movie["title"], movie["id"]) for movie in movies]
+    writer = get_writer()
+    if writer is not None and writer.submit(rows):
+        return
+    save_rows(rows)
+
+
+def _to_datetime(value):
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+
+def encode_cursor(timestamp, row_id):
+    return f"{timestamp.isoformat()}_{row_id}"
+
+
+def decode_cursor(cursor):
+    """'?before=' parametresini (Timestamp, Id) ikilisine çevirir; geçersizse None döner."""
+    try:
+        timestamp, row_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+class HistoryPage:
+    """
+    Kullanıcının öneri geçmişinden bir sayfa.
+    (Timestamp, Id) üzerinde keyset sayfalama yapılır: sayfa ne kadar eski olursa olsun
+    sorgu indeksten sadece HISTORY_PAGE_SIZE satır okur. Satırlar SQL tarafında soruya göre
+    gruplanmış sırada gelir; üzerinde dönüldükçe (soru, filmler) grupları üretilir ve
+    veritabanından parça parça okunur, böylece sayfa akış halinde (stream) gönderilebilir.
+    Dönüş bitince next_cursor sonraki sayfanın imlecini içerir (son sayfada None).
+    """
+
+    def __init__(self, user_id, before=None, limit=HISTORY_PAGE_SIZE):
+        self.user_id = user_id
+        self.before = decode_cursor(before) if before else None
+        self.limit = limit
+        self.next_cursor = None
+
+    def _query(self):
+        if pool.dialect == "sqlserver":
+            top, limit = "TOP (?)", ""
+        else:
+            top, limit = "", "LIMIT ?"
+
+        params = [self.limit, self.user_id] if top else [self.user_id]
+        keyset = ""
+        if self.before:
+            timestamp, row_id = self.before
+            if pool.dialect == "sqlite":
+                timestamp = timestamp.isoformat(sep=" ")
+            keyset = "AND (Timestamp < ? OR (Timestamp = ? AND Id < ?))"
+            params += [timestamp, timestamp, row_id]
+        if limit:
+            params.append(self.limit)
+
+        # İç sorgu: indeksten en yeni N satır; dış sorgu: aynı soruya ait satırları yan yana getirir
+        sql = f"""
+            SELECT QuestionText, RecommendedMovie, RecommendedMovieId, Timestamp, Id
+            FROM (
+                SELECT {top} Id, QuestionText, RecommendedMovie, RecommendedMovieId, Timestamp
+                FROM Recommendations
+                WHERE UserId = ? {keyset}
+                ORDER BY Timestamp DESC, Id DESC
+                {limit}
+            ) AS page
+            ORDER BY MAX(Timestamp) OVER (PARTITION BY QuestionText) DESC, QuestionText, Timestamp DESC, Id DESC
+        """
+        return sql, params
+
+    def _rows(self):
+        sql, params = self._query()
+        count = 0
+        oldest = None
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(50)
+                if not rows:
+                    break
+                for row in rows:
+                    count += 1
+                    key = (_to_datetime(row.Timestamp), row.Id)
+                    if oldest is None or key < oldest:
+                        oldest = key
+                    yield row
+        if count == self.limit and oldest is not None:
+            self.next_cursor = encode_cursor(*oldest)
+
+    def __iter__(self):
+        for question, rows in groupby(self._rows(), key=lambda row: row.QuestionText):
+            movies = [
+                {"title": row.RecommendedMovie, "id": row.RecommendedMovieId, "timestamp": _to_datetime(row.Timestamp)}
+                for row in rows
+            ]
+            yield question, movies
@@ -0,0 +1,103 @@
+"""
+/recommend akışının tamamı: analiz -> film bulma -> geçmişe kaydetme.
+Hem normal (senkron) form gönderimi hem de arka planda çalışan asenkron işler bu modülü kullanır.
+"""
+import discover_prewarm
+import mood_lexicon
+import taste_profile
+from llm_analyzer import analyze_user_input
+from recommendation_log import record_recommendations
+from tmdb_client import get_movies_by_genres_and_keywords
+
+ERROR_NO_GENRES = "🎬 Ruh haline göre film bulamadık. Lütfen bir şeyler yaz."
+ERROR_NO_MOVIES = "🎭 Üzgünüz, bu duyguya uygun film bulunamadı."
+ERROR_NO_HISTORY = "Henüz seninle ilgili öneri geçmişimiz yok. Ruh halini yazıp başlayabilirsin 🎬"
+ERROR_FAILED = "⚠️ Sistem, yazdıklarını anlayamadı. Lütfen ruh halinle ilgili bir şeyler yaz (örneğin: 'Yorgunum ve hüzünlüyüm')."
+
+
+def analyze_user_history(user_id):
+    # Tüm geçmiş yerine saklanan zevk profili okunur; Gemini'ye gidilmez
+    profile = taste_profile.load_profile(user_id)
+    if profile is None:
+        # Profili henüz olmayan kullanıcı için en yeni sorulardan bir kez oluştur; istek içinde
+        # Gemini'ye gidilmez, sorular sözlükle analiz edilir (Gemini ile yeniden oluşturmak için --backfill)
+        profile = taste_profile.build_profile_from_history(
+            user_id, mood_lexicon.classify, limit=taste_profile.LAZY_BUILD_LIMIT
+        )
+
+    if not profile:
+        return None
+
+    return taste_profile.profile_to_analysis(profile)
+
+
+def find_movies(genres, keywords):
+    # Yerel katalog varsa öneriler bellekten hesaplanır; yoksa (ya da katalogda sonuç yoksa) önceden
+    # hazırlanmış discover sonucu, o da yoksa TMDb discover kullanılır (catalog NumPy'ı yüklediği için
+    # ilk kullanımda içe aktarılır)
+    import catalog
+    movies = catalog.search(genres, keywords)
+    if not movies:
+        movies = discover_prewarm.lookup(genres)
+    if not movies:
+        movies = get_movies_by_genres_and_keywords(genres, keywords)
+    return movies
+
+
+def split_top_movie(movies):
+    """Önerileri ayır: 1 tanesi en yüksek puanlı (en üstte gösterilecek), kalanlar slider'da."""
+    if not movies:
+        return None, []
+    top_movie = max(movies, key=lambda x: x["vote_average"])
+    other_movies = [m for m in movies if m["id"] != top_movie["id"]]
+    return top_movie, other_movies
+
+
+def _ignore(event, data):
+    pass
+
+
+def run(user_id, user_input, emit=_ignore):
+    """
+    Öneri akışını çalıştırır.
+    :param emit: her adım tamamlandığında emit(olay_adı, veri) şeklinde çağrılır
+                 ("analysis", "top_movie", "movies"); asenkron mod sonuçları bununla akıtır
+    :return: (top_movie, other_movies, error)
+    """
+    try:
+        if user_input:
+            result = analyze_user_input(user_input)
+        else:
+            result = analyze_user_history(user_id)  # Özel öneri geçmişten
+
+        if not result:
+            return None, [], ERROR_NO_HISTORY
+
+        genres = result.get("turler", [])
+        keywords = result.get("anahtar_kelimeler", [])
+        emit("analysis", {"turler": genres, "anahtar_kelimeler": keywords})
+
+        if not genres:
+            return None, [], ERROR_NO_GENRES
+
+        movies = find_movies(genres, keywords)
+        if not movies:
+            return None, [], ERROR_NO_MOVIES
+
+        top_movie, other_movies = split_top_movie(movies)
+        emit("top_movie", top_movie)
+        emit("movies", other_movies)
+
+        # Sadece kullanıcı bir şey yazdıysa veritabanına kaydet
+        if user_input:
+            record_recommendations(user_id, user_input, movies)
+            try:
+                taste_profile.update_profile(user_id, result, user_input)
+            except Exception as e:
+                print("❌ Zevk profili güncellenemedi:", e)
+
+        return top_movie, other_movies, None
+
+    except Exception as e:
+        print("❌ Hata:", e)
+        return None, [], ERROR_FAILED
@@ -0,0 +1,268 @@
+"""
+Dış servis çağrıları (TMDb, Gemini) için ortak dayanıklılık katmanı.
+Yavaş ya da çökmüş bir servis tüm Flask işçilerini bekletmemeli; bu modül dört parçadan oluşur:
+
+- Tekil uçuş (single-flight): aynı anahtarla süren bir çağrı varsa yenisi başlatılmaz, sonucu beklenir
+- Süre bütçesi: her isteğin toplam bir süresi vardır (REQUEST_BUDGET); çağrıların zaman aşımı bütçenin
+  kalanından hesaplanır, bütçe bitince yeni çağrı ya da yeniden deneme yapılmaz
+- Yeniden deneme: geçici hatalarda rastgele (jitter) üstel bekleme; 429 yanıtındaki Retry-After'a uyulur
+- Devre kesici: art arda hatalardan sonra servis bir süre sağlıksız sayılır ve çağrılar hemen reddedilir;
+  çağıran eski (süresi dolmuş) önbellek verisini kullanabilir
+"""
+import contextlib
+import contextvars
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from email.utils import parsedate_to_datetime
+
+# Bir isteğin dış servislerde harcayabileceği toplam süre (saniye)
+REQUEST_BUDGET = float(os.getenv("REQUEST_BUDGET", 10))
+RETRY_ATTEMPTS = int(os.getenv("UPSTREAM_RETRY_ATTEMPTS", 3))
+RETRY_BASE_DELAY = float(os.getenv("UPSTREAM_RETRY_BASE_DELAY", 0.2))
+RETRY_MAX_DELAY = float(os.getenv("UPSTREAM_RETRY_MAX_DELAY", 2))
+# Bu kadar art arda hatadan sonra devre açılır ve BREAKER_RESET_TIMEOUT saniye çağrı yapılmaz
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", 5))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", 30))
+
+
+class UpstreamError(Exception):
+    """Dış servisten sonuç alınamadı (çağıran eski veriye ya da yedek yola düşebilir)."""
+
+
+class DeadlineExceeded(UpstreamError):
+    pass
+
+
+class CircuitOpen(UpstreamError):
+    pass
+
+
+class RetryableError(UpstreamError):
+    """
+    Geçici hata (ağ hatası, 5xx, 429); yeniden denenebilir.
+    :param retry_after: servisin istediği bekleme süresi (saniye), yoksa None
+    """
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# İsteğin bitmesi gereken an (time.monotonic); metrics.submit ile havuzdaki çağrılara da taşınır
+_deadline = contextvars.ContextVar("deadline", default=None)
+
+
+@contextlib.contextmanager
+def budget(seconds):
+    """Blok içindeki çağrılara süre bütçesi verir; dıştaki bütçe daha kısaysa o geçerli kalır."""
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def current_deadline():
+    """Geçerli bütçenin bitiş anı (time.monotonic); bütçe yoksa None."""
+    return _deadline.get()
+
+
+def remaining():
+    """Bütçenin kalan süresi (saniye); bütçe yoksa None."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def timeout_for(default):
+    """
+    Tek bir çağrının zaman aşımı: varsayılan süre ile bütçenin kalanından küçük olanı.
+    :raises DeadlineExceeded: bütçe bittiyse
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded("İstek süre bütçesi doldu")
+    return min(default, left)
+
+
+def parse_retry_after(value):
+    """Retry-After başlığını (saniye ya da HTTP tarihi) saniyeye çevirir; okunamazsa None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class SingleFlight:
+    """Aynı anahtarla eşzamanlı gelen çağrılardan sadece biri çalışır, diğerleri sonucunu paylaşır."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key, fn, *args):
+        with self._lock:
+            future = self._calls.get(key)
+            owner = future is None
+            if owner:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            # Bekleyen istek kendi bütçesiyle sınırlıdır; çağrıyı başlatanın süresine bağlı kalmaz
+            left = remaining()
+            if left is not None and left <= 0:
+                raise DeadlineExceeded("İstek süre bütçesi doldu")
+            try:
+                return future.result(left)
+            except FutureTimeout:
+                raise DeadlineExceeded("Süren çağrı bütçe içinde tamamlanmadı") from None
+
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class CircuitBreaker:
+    """
+    Üç durumlu devre kesici: kapalı (normal) -> açık (çağrılar reddedilir) -> yarı açık
+    (reset_timeout sonrası tek bir deneme çağrısına izin verilir; başarılıysa kapanır, değilse yeniden açılır).
+    """
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.opened = 0
+        _breakers.append(self)
+
+    def allow(self):
+        """:raises CircuitOpen: servis sağlıksız sayılıyorsa"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            if self.state != self.CLOSED:
+                self.rejected += 1
+                raise CircuitOpen(f"{self.name} geçici olarak devre dışı")
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                print(f"✅ {self.name} yeniden sağlıklı, devre kapandı")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                if self.state == self.CLOSED:
+                    print(f"⚠️ {self.name} art arda {self.failures} kez başarısız, devre açıldı")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probe_in_flight = False
+                self.opened += 1
+
+    def release(self):
+        """Servisin sağlığı hakkında bilgi vermeyen sonuç (ör. bütçe çağrıdan önce bitti)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": {self.CLOSED: 0, self.HALF_OPEN: 1, self.OPEN: 2}[self.state],
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "opened": self.opened,
+            }
+
+
+_breakers = []
+
+
+def backoff(attempt):
+    """Tam rastgele (full jitter) üstel bekleme süresi."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+def call(breaker, fn, *args, attempts=RETRY_ATTEMPTS):
+    """
+    fn(*args)'ı devre kesici ve yeniden deneme ile çalıştırır.
+    fn geçici hatalar için RetryableError fırlatmalıdır; diğer hatalar denenmeden iletilir.
+    Beklemeler bütçeyi aşacaksa yeniden denenmez.
+    """
+    for attempt in range(attempts):
+        breaker.allow()
+        try:
+            result = fn(*args)
+        except RetryableError as e:
+            breaker.record_failure()
+            if attempt + 1 == attempts:
+                raise
+            delay = e.retry_after if e.retry_after is not None else backoff(attempt)
+            left = remaining()
+            if left is not None and delay >= left:
+                raise DeadlineExceeded(f"Yeniden deneme bütçeye sığmıyor ({e})") from e
+            time.sleep(delay)
+        except Exception:
+            breaker.release()
+            raise
+        else:
+            breaker.record_success()
+            return result
+
+
+def init_app(app, request_budget=REQUEST_BUDGET):
+    """Her Flask isteğine süre bütçesi verir (dış servis çağrıları bu süreyi aşamaz)."""
+    from flask import g
+
+    @app.before_request
+    def _start_budget():
+        g.resilience_token = _deadline.set(time.monotonic() + request_budget)
+
+    @app.teardown_request
+    def _reset_budget(exc):
+        token = g.pop("resilience_token", None)
+        if token is not None:
+            _deadline.reset(token)
+
+
+def stats():
+    """/metrics için devre kesici durumları (durum: 0 kapalı, 1 yarı açık, 2 açık)."""
+    return {f"{breaker.name}_{field}": value for breaker in _breakers for field, value in breaker.stats().items()}
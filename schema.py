@@ -0,0 +1,216 @@
+"""
+Veritabanı şeması ve göçleri (migration).
+Tablolar ve indeksler hem SQL Server hem de SQLite için tanımlıdır. Uygulanan göçler
+SchemaMigrations tablosunda tutulur; migrate() yalnızca henüz uygulanmamış olanları çalıştırır.
+
+SQLite arka ucu ilk bağlantıda göçleri otomatik uygular. SQL Server için:
+
+    python schema.py --migrate
+"""
+import argparse
+
+SQLITE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS Users (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+        Username TEXT NOT NULL UNIQUE,
+        Email TEXT NOT NULL UNIQUE,
+        PasswordHash TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Recommendations (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+        UserId INTEGER NOT NULL REFERENCES Users(Id),
+        QuestionText TEXT NOT NULL,
+        RecommendedMovie TEXT NOT NULL,
+        RecommendedMovieId INTEGER NOT NULL,
+        Timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Favorites (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+        UserId INTEGER NOT NULL REFERENCES Users(Id),
+        MovieId INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Comments (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+        UserId INTEGER NOT NULL REFERENCES Users(Id),
+        MovieId INTEGER NOT NULL,
+        CommentText TEXT NOT NULL,
+        CreatedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS UserTasteProfiles (
+        UserId INTEGER PRIMARY KEY REFERENCES Users(Id),
+        Profile TEXT NOT NULL,
+        UpdatedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+]
+
+SQLSERVER_TABLES = [
+    """
+    IF OBJECT_ID(N'dbo.Users', N'U') IS NULL
+    CREATE TABLE dbo.Users (
+        Id INT IDENTITY(1,1) PRIMARY KEY,
+        Username NVARCHAR(100) NOT NULL UNIQUE,
+        Email NVARCHAR(255) NOT NULL UNIQUE,
+        PasswordHash NVARCHAR(255) NOT NULL
+    )
+    """,
+    """
+    IF OBJECT_ID(N'dbo.Recommendations', N'U') IS NULL
+    CREATE TABLE dbo.Recommendations (
+        Id INT IDENTITY(1,1) PRIMARY KEY,
+        UserId INT NOT NULL REFERENCES dbo.Users(Id),
+        QuestionText NVARCHAR(1000) NOT NULL,
+        RecommendedMovie NVARCHAR(500) NOT NULL,
+        RecommendedMovieId INT NOT NULL,
+        Timestamp DATETIME NOT NULL DEFAULT GETDATE()
+    )
+    """,
+    """
+    IF OBJECT_ID(N'dbo.Favorites', N'U') IS NULL
+    CREATE TABLE dbo.Favorites (
+        Id INT IDENTITY(1,1) PRIMARY KEY,
+        UserId INT NOT NULL REFERENCES dbo.Users(Id),
+        MovieId INT NOT NULL
+    )
+    """,
+    """
+    IF OBJECT_ID(N'dbo.Comments', N'U') IS NULL
+    CREATE TABLE dbo.Comments (
+        Id INT IDENTITY(1,1) PRIMARY KEY,
+        UserId INT NOT NULL REFERENCES dbo.Users(Id),
+        MovieId INT NOT NULL,
+        CommentText NVARCHAR(2000) NOT NULL,
+        CreatedAt DATETIME NOT NULL DEFAULT GETDATE()
+    )
+    """,
+    """
+    IF OBJECT_ID(N'dbo.UserTasteProfiles', N'U') IS NULL
+    CREATE TABLE dbo.UserTasteProfiles (
+        UserId INT PRIMARY KEY REFERENCES dbo.Users(Id),
+        Profile NVARCHAR(MAX) NOT NULL,
+        UpdatedAt DATETIME NOT NULL DEFAULT GETDATE()
+    )
+    """,
+]
+
+# Eski SELECT + INSERT yarışı yüzünden oluşmuş tekrar eden favoriler benzersiz indeksten önce silinir
+DEDUPLICATE_FAVORITES = """
+    DELETE FROM Favorites
+    WHERE Id NOT IN (SELECT MIN(Id) FROM Favorites GROUP BY UserId, MovieId)
+"""
+
+# İndeksler sorguların kendisine göre seçilmiştir:
+# - geçmiş sayfası ve zevk profili: WHERE UserId = ? ORDER BY Timestamp DESC, Id DESC
+# - favoriler: WHERE UserId = ? (AND MovieId = ?), ekleme tek ifadelik upsert
+# - yorumlar: WHERE MovieId = ? ORDER BY CreatedAt DESC, Id DESC, Users ile UserId üzerinden birleşir
+# SQLite'ta her indeks rowid'yi (Id) zaten içerir; INCLUDE desteklenmez, birleşim için gereken
+# sütunlar (yorumlarda UserId) anahtarın sonuna eklenir. Id bu durumda sıralama için UserId'den
+# önce açıkça yazılır, yoksa ORDER BY ... Id DESC için ek sıralama gerekir.
+SQLITE_INDEXES = [
+    DEDUPLICATE_FAVORITES,
+    "CREATE UNIQUE INDEX IF NOT EXISTS UX_Favorites_UserId_MovieId ON Favorites (UserId, MovieId)",
+    "CREATE INDEX IF NOT EXISTS IX_Recommendations_UserId_Timestamp ON Recommendations (UserId, Timestamp)",
+    "CREATE INDEX IF NOT EXISTS IX_Comments_MovieId_CreatedAt ON Comments (MovieId, CreatedAt, Id, UserId)",
+]
+
+
+def _sqlserver_index(name, table, definition):
+    return f"""
+    IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'{name}' AND object_id = OBJECT_ID(N'dbo.{table}'))
+    CREATE {definition}
+    """
+
+
+SQLSERVER_INDEXES = [
+    DEDUPLICATE_FAVORITES,
+    _sqlserver_index("UX_Favorites_UserId_MovieId", "Favorites",
+                     "UNIQUE INDEX UX_Favorites_UserId_MovieId ON dbo.Favorites (UserId, MovieId)"),
+    _sqlserver_index("IX_Recommendations_UserId_Timestamp", "Recommendations",
+                     "INDEX IX_Recommendations_UserId_Timestamp ON dbo.Recommendations (UserId, Timestamp DESC, Id DESC) "
+                     "INCLUDE (QuestionText, RecommendedMovie, RecommendedMovieId)"),
+    _sqlserver_index("IX_Comments_MovieId_CreatedAt", "Comments",
+                     "INDEX IX_Comments_MovieId_CreatedAt ON dbo.Comments (MovieId, CreatedAt DESC, Id DESC) "
+                     "INCLUDE (UserId)"),
+]
+
+# (sürüm, açıklama, {lehçe: ifadeler}); yeni göçler listenin sonuna eklenir
+MIGRATIONS = [
+    (1, "tablolar", {"sqlite": SQLITE_TABLES, "sqlserver": SQLSERVER_TABLES}),
+    (2, "indeksler", {"sqlite": SQLITE_INDEXES, "sqlserver": SQLSERVER_INDEXES}),
+]
+
+VERSION_TABLE = {
+    "sqlite": """
+        CREATE TABLE IF NOT EXISTS SchemaMigrations (
+            Version INTEGER PRIMARY KEY,
+            Name TEXT NOT NULL,
+            AppliedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    "sqlserver": """
+        IF OBJECT_ID(N'dbo.SchemaMigrations', N'U') IS NULL
+        CREATE TABLE dbo.SchemaMigrations (
+            Version INT PRIMARY KEY,
+            Name NVARCHAR(200) NOT NULL,
+            AppliedAt DATETIME NOT NULL DEFAULT GETDATE()
+        )
+    """,
+}
+
+
+def migrate(conn, dialect):
+    """
+    Uygulanmamış göçleri sırayla çalıştırır; her göç ayrı bir işlemde commit edilir.
+    :return: uygulanan göç sürümlerinin listesi
+    """
+    if dialect not in VERSION_TABLE:
+        raise ValueError(f"{dialect} için şema oluşturma desteklenmiyor")
+
+    cursor = conn.cursor()
+    cursor.execute(VERSION_TABLE[dialect])
+    conn.commit()
+    cursor.execute("SELECT Version FROM SchemaMigrations")
+    applied = {row[0] for row in cursor.fetchall()}
+
+    newly_applied = []
+    for version, name, statements in MIGRATIONS:
+        if version in applied:
+            continue
+        for statement in statements[dialect]:
+            cursor.execute(statement)
+        cursor.execute("INSERT INTO SchemaMigrations (Version, Name) VALUES (?, ?)", (version, name))
+        conn.commit()
+        newly_applied.append(version)
+    return newly_applied
+
+
+def create_all(conn, dialect):
+    """Eksik tabloları ve indeksleri oluşturur (migrate ile aynı)."""
+    return migrate(conn, dialect)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MoodFlix veritabanı şeması")
+    parser.add_argument("--migrate", action="store_true", help="uygulanmamış göçleri çalıştır")
+    args = parser.parse_args()
+
+    if args.migrate:
+        from db import get_connection, pool
+        with get_connection() as conn:
+            applied = migrate(conn, pool.dialect)
+        print(f"✅ Uygulanan göçler: {applied or 'yok (şema güncel)'}")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Kullanıcı başına saklanan zevk profili: tür ve anahtar kelime ağırlıkları.
+Her yeni analiz kaydedildiğinde profil artımlı olarak güncellenir; eski analizlerin etkisi
+zamanla (yarılanma süresiyle) azalır. Kişisel öneri için tüm geçmişi okuyup Gemini'ye
+göndermek yerine tek satırlık profil okunur.
+
+Mevcut kullanıcılar için doldurma: python taste_profile.py --backfill [--lexicon-only]
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+import mood_lexicon
+from db import get_connection, pool
+
+HALF_LIFE_DAYS = float(os.getenv("TASTE_PROFILE_HALF_LIFE_DAYS", 30))
+MAX_KEYWORDS = 50
+# Profil yoksa geçmişten anlık oluştururken bakılacak en fazla farklı soru sayısı
+# (istek içinde yapıldığı için sadece sözlükle analiz edilir, Gemini'ye gidilmez)
+LAZY_BUILD_LIMIT = 20
+
+# Güncelleme sırasında profil satırı kilitlenir; aynı kullanıcı için eşzamanlı iki güncelleme
+# birbirinin artışını ezmez (SQLite'ta işlem BEGIN IMMEDIATE ile yazma kilidiyle başlar)
+LOCK_PROFILE_SQL = {
+    "sqlserver": "SELECT Profile FROM UserTasteProfiles WITH (UPDLOCK, HOLDLOCK) WHERE UserId = ?",
+    "sqlite": "SELECT Profile FROM UserTasteProfiles WHERE UserId = ?",
+}
+
+# Kullanıcının farklı soruları, ilk sorulma zamanıyla (en yeniden eskiye)
+QUESTIONS_SQL = """
+    SELECT QuestionText, MIN(Timestamp) AS FirstSeen
+    FROM Recommendations
+    WHERE UserId = ?
+    GROUP BY QuestionText
+    ORDER BY FirstSeen DESC
+"""
+
+
+def empty_profile():
+    return {"genres": {}, "keywords": {}, "updated_at": None, "analyses": 0}
+
+
+def apply_analysis(profile, analysis, at=None):
+    """
+    Bir analiz sonucunu profile ekler. Önce mevcut ağırlıklar geçen süreye göre azaltılır,
+    sonra yeni tür ve anahtar kelimelere 1 puan eklenir.
+    """
+    at = at or time.time()
+    if profile["updated_at"] is not None and at > profile["updated_at"]:
+        decay = 0.5 ** ((at - profile["updated_at"]) / (HALF_LIFE_DAYS * 86400))
+        for bucket in ("genres", "keywords"):
+            profile[bucket] = {name: weight * decay for name, weight in profile[bucket].items()}
+
+    for genre in analysis.get("turler", []):
+        profile["genres"][genre] = profile["genres"].get(genre, 0.0) + 1.0
+    for keyword in analysis.get("anahtar_kelimeler", []):
+        profile["keywords"][keyword] = profile["keywords"].get(keyword, 0.0) + 1.0
+
+    # Anahtar kelime listesi sınırsız büyümesin
+    if len(profile["keywords"]) > MAX_KEYWORDS:
+        top = sorted(profile["keywords"].items(), key=lambda item: item[1], reverse=True)[:MAX_KEYWORDS]
+        profile["keywords"] = dict(top)
+
+    profile["updated_at"] = max(at, profile["updated_at"] or 0)
+    profile["analyses"] += 1
+    return profile
+
+
+def profile_to_analysis(profile, max_genres=3, max_keywords=5):
+    """Profili analyze_user_input çıktısıyla aynı biçime çevirir."""
+    genres = sorted(profile["genres"].items(), key=lambda item: item[1], reverse=True)[:max_genres]
+    keywords = sorted(profile["keywords"].items(), key=lambda item: item[1], reverse=True)[:max_keywords]
+    return {
+        "turler": [name for name, _ in genres],
+        "anahtar_kelimeler": [name for name, _ in keywords],
+    }
+
+
+def load_profile(user_id):
+    """Kullanıcının profilini tek bir birincil anahtar sorgusuyla okur; yoksa None döner."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT Profile FROM UserTasteProfiles WHERE UserId = ?", (user_id,))
+        row = cursor.fetchone()
+    return json.loads(row.Profile) if row else None
+
+
+def save_profile(user_id, profile):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        _write_profile(cursor, user_id, profile)
+        conn.commit()
+
+
+def _write_profile(cursor, user_id, profile):
+    payload = json.dumps(profile, ensure_ascii=False)
+    if pool.dialect == "sqlserver":
+        cursor.execute("""
+            MERGE UserTasteProfiles AS target
+            USING (SELECT ? AS UserId, ? AS Profile) AS source
+            ON target.UserId = source.UserId
+            WHEN MATCHED THEN UPDATE SET Profile = source.Profile, UpdatedAt = GETDATE()
+            WHEN NOT MATCHED THEN INSERT (UserId, Profile) VALUES (source.UserId, source.Profile);
+        """, (user_id, payload))
+    else:
+        cursor.execute("""
+            INSERT INTO UserTasteProfiles (UserId, Profile) VALUES (?, ?)
+            ON CONFLICT(UserId) DO UPDATE SET Profile = excluded.Profile, UpdatedAt = CURRENT_TIMESTAMP
+        """, (user_id, payload))
+
+
+def update_profile(user_id, analysis, question_text=None):
+    """
+    Yeni kaydedilen bir analizi kullanıcının profiline işler.
+    Okuma ve yazma, profil satırı kilitli tek bir işlemde yapılır. Profili henüz olmayan
+    kullanıcıda önce geçmişten (sözlükle, en yeni LAZY_BUILD_LIMIT soru) profil oluşturulur;
+    yoksa satır yazıldıktan sonra anlık oluşturma bir daha çalışmaz ve eski geçmiş kaybolur.
+    :param question_text: analizi yapılan soru; geçmişte de varsa iki kez sayılmaz
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        if pool.dialect == "sqlite":
+            cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute(LOCK_PROFILE_SQL[pool.dialect], (user_id,))
+        row = cursor.fetchone()
+        if row:
+            profile = json.loads(row.Profile)
+        else:
+            cursor.execute(QUESTIONS_SQL, (user_id,))
+            rows = [r for r in cursor.fetchmany(LAZY_BUILD_LIMIT + 1) if r.QuestionText != question_text]
+            profile = _profile_from_rows(rows[:LAZY_BUILD_LIMIT], mood_lexicon.classify)
+        apply_analysis(profile, analysis)
+        _write_profile(cursor, user_id, profile)
+        conn.commit()
+    return profile
+
+
+def _to_epoch(value):
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(str(value)).timestamp()
+
+
+def build_profile_from_history(user_id, analyze, limit=None):
+    """
+    Recommendations tablosundaki farklı soruları (her film için tekrarlanmadan) analiz ederek
+    profili sıfırdan oluşturur.
+    :param analyze: soru metnini analiz eden fonksiyon (ör. analyze_user_input)
+    :param limit: sadece en yeni bu kadar soruyu kullan
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(QUESTIONS_SQL, (user_id,))
+        rows = cursor.fetchmany(limit) if limit else cursor.fetchall()
+
+    if not rows:
+        return None
+
+    profile = _profile_from_rows(rows, analyze)
+    save_profile(user_id, profile)
+    return profile
+
+
+def _profile_from_rows(rows, analyze):
+    """QUESTIONS_SQL satırlarından (en yeniden eskiye) profil oluşturur."""
+    profile = empty_profile()
+    # Azalma doğru hesaplansın diye eskiden yeniye işlenir
+    for row in reversed(rows):
+        apply_analysis(profile, analyze(row.QuestionText), at=_to_epoch(row.FirstSeen))
+    return profile
+
+
+def backfill(analyze):
+    """Geçmişi olan tüm kullanıcıların profilini yeniden oluşturur."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT UserId FROM Recommendations")
+        user_ids = [row.UserId for row in cursor.fetchall()]
+
+    for index, user_id in enumerate(user_ids, start=1):
+        profile = build_profile_from_history(user_id, analyze)
+        print(f"✅ [{index}/{len(user_ids)}] Kullanıcı {user_id}: {profile['analyses']} analiz işlendi")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kullanıcı zevk profillerini geçmişten oluşturur")
+    parser.add_argument("--backfill", action="store_true", help="tüm kullanıcılar için profilleri yeniden oluştur")
+    parser.add_argument("--lexicon-only", action="store_true", help="Gemini'ye gitmeden sadece sözlükle analiz et")
+    args = parser.parse_args()
+
+    if not args.backfill:
+        parser.print_help()
+    elif args.lexicon_only:
+        import mood_lexicon
+        backfill(mood_lexicon.classify)
+    else:
+        from llm_analyzer import analyze_user_input
+        backfill(analyze_user_input)
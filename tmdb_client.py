@@ -1,10 +1,72 @@
 import os
-import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from cache import MISSING, DiskStore, TTLCache
+import metrics
+import resilience
 
 # .env dosyasından çevresel değişkenleri yükle (örneğin API anahtarı)
 load_dotenv()
 TMDB_API_KEY = os.getenv("TMDB_API_KEY")
+TMDB_BASE_URL = os.getenv("TMDB_BASE_URL", "https://api.themoviedb.org/3").rstrip("/")
+TMDB_LANGUAGE = os.getenv("TMDB_LANGUAGE", "tr-TR")
+
+# Tüm çağrılar aynı keep-alive oturumunu kullanır; her istekte yeni TCP+TLS el sıkışması yapılmaz
+TMDB_POOL_SIZE = int(os.getenv("TMDB_POOL_SIZE", 32))
+TMDB_MAX_WORKERS = int(os.getenv("TMDB_MAX_WORKERS", 16))
+
+# Tek bir TMDb isteğinin en uzun süresi (isteğin kalan süre bütçesi daha kısaysa o kullanılır)
+TMDB_TIMEOUT = float(os.getenv("TMDB_TIMEOUT", 5))
+# TMDb'ye ulaşılamadığında süresi dolmuş önbellek kaydı bu süreye kadar (saniye) kullanılabilir
+TMDB_STALE_TTL = int(os.getenv("TMDB_STALE_TTL", 7 * 24 * 3600))
+
+# TMDb art arda hata verirse çağrılar bir süre hemen reddedilir; aynı isteği bekleyenler tek çağrıyı paylaşır
+_breaker = resilience.CircuitBreaker("tmdb")
+_flight = resilience.SingleFlight()
+
+# requests ilk TMDb çağrısında yüklenir (uygulama açılışı yavaşlamasın)
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=TMDB_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+# Toplu isteklerde kullanılan sınırlı iş parçacığı havuzu
+_executor = ThreadPoolExecutor(max_workers=TMDB_MAX_WORKERS, thread_name_prefix="tmdb")
+
+# Uç noktalara göre önbellek süreleri (saniye):
+# film detayları nadiren değişir, platformlar günlük, discover sonuçları saatlik değişir
+CACHE_TTLS = {
+    "details": int(os.getenv("TMDB_TTL_DETAILS", 7 * 24 * 3600)),
+    "providers": int(os.getenv("TMDB_TTL_PROVIDERS", 24 * 3600)),
+    "discover": int(os.getenv("TMDB_TTL_DISCOVER", 3600)),
+    # Detay sayfası yanıtı platform bilgisini de içerdiği için platformlarla aynı sürede yenilenir
+    "movie_page": int(os.getenv("TMDB_TTL_PROVIDERS", 24 * 3600)),
+}
+CACHE_MAXSIZE = int(os.getenv("TMDB_CACHE_MAXSIZE", 2048))
+
+# TMDB_CACHE_PATH verilirse önbellek yeniden başlatmalardan sonra da diskte korunur
+_disk_path = os.getenv("TMDB_CACHE_PATH")
+_disk_store = DiskStore(_disk_path) if _disk_path else None
+
+_caches = {
+    endpoint: TTLCache(f"tmdb:{endpoint}", maxsize=CACHE_MAXSIZE, default_ttl=ttl, disk_store=_disk_store,
+                       stale_ttl=TMDB_STALE_TTL)
+    for endpoint, ttl in CACHE_TTLS.items()
+}
 
 # Türkçe tür isimlerini TMDb'deki tür ID'leriyle eşleştir
 GENRES = {
@@ -23,6 +85,7 @@ GENRES = {
     "müzikal": 10402,
     "gizem": 9648,
     "romantizm": 10749,
+    "romantik": 10749,
     "bilim kurgu": 878,
     "tv filmi": 10770,
     "gerilim": 53,
@@ -35,6 +98,79 @@ GENRES = {
 # Tür ID'den tekrar tür ismine ulaşmak için ters bir eşleme oluştur
 genre_map = {v: k.title() for k, v in GENRES.items()}
 
+
+def _cache_key(url, params):
+    # API anahtarı önbellek anahtarına dahil edilmez
+    items = sorted((k, v) for k, v in params.items() if k != "api_key" and v is not None)
+    return url + "?" + "&".join(f"{k}={v}" for k, v in items)
+
+
+def _request(url, params):
+    """
+    Tek bir TMDb isteği; zaman aşımı isteğin kalan bütçesinden hesaplanır.
+    :raises resilience.RetryableError: ağ hatası, 5xx ya da 429 (Retry-After ile)
+    """
+    import requests
+    try:
+        response = get_session().get(url, params=params, timeout=resilience.timeout_for(TMDB_TIMEOUT))
+    except requests.RequestException as e:
+        raise resilience.RetryableError(f"TMDb isteği başarısız: {e}") from e
+    if response.status_code == 429:
+        raise resilience.RetryableError(
+            "TMDb hız sınırı (429)", retry_after=resilience.parse_retry_after(response.headers.get("Retry-After")))
+    if response.status_code >= 500:
+        raise resilience.RetryableError(f"TMDb sunucu hatası ({response.status_code})")
+    return response
+
+
+def _call(url, params):
+    """TMDb isteğini devre kesici ve yeniden deneme ile yapar."""
+    return resilience.call(_breaker, _request, url, params)
+
+
+def _fetch_json(endpoint, key, url, params):
+    with metrics.span("tmdb", endpoint):
+        response = _call(url, params)
+        data = response.json()
+    if response.status_code == 200:
+        _caches[endpoint].set(key, data)
+    return response.status_code, data
+
+
+def _get_json(endpoint, url, params):
+    """
+    TMDb isteğini önbellek üzerinden yapar.
+    Sadece başarılı (200) yanıtlar önbelleğe yazılır. Aynı anahtar için süren bir istek varsa
+    yenisi yapılmaz; TMDb'ye ulaşılamazsa (devre açık, bütçe doldu, denemeler tükendi) süresi
+    dolmuş kayıt varsa o döndürülür.
+    :return: (durum kodu, JSON verisi)
+    """
+    cache = _caches[endpoint]
+    key = _cache_key(url, params)
+    cached = cache.get(key)
+    if cached is not MISSING:
+        return 200, cached
+
+    try:
+        return _flight.do(key, _fetch_json, endpoint, key, url, params)
+    except resilience.UpstreamError as e:
+        stale = cache.get_stale(key)
+        if stale is MISSING:
+            raise
+        print(f"⚠️ TMDb'ye ulaşılamadı, eski veri kullanılıyor ({endpoint}):", e)
+        return 200, stale
+
+
+def cache_stats():
+    """Her uç noktanın önbellek isabet / ıskalama / çıkarma sayaçlarını döndürür."""
+    return {endpoint: cache.stats() for endpoint, cache in _caches.items()}
+
+
+def clear_cache():
+    """Bellek içi önbelleği temizler (disk katmanına dokunmaz)."""
+    for cache in _caches.values():
+        cache.clear()
+
 def get_movies_by_genres_and_keywords(genres_list=None, keywords=None):
     """
     Belirli türler (ve opsiyonel olarak anahtar kelimeler) ile TMDb API üzerinden film araması yapar.
@@ -46,43 +182,114 @@ def get_movies_by_genres_and_keywords(genres_list=None, keywords=None):
     print("➡️ Gelen türler:", genres_list)
     print("➡️ Gelen anahtar kelimeler:", keywords)
 
-    url = "https://api.themoviedb.org/3/discover/movie"
+    url = f"{TMDB_BASE_URL}/discover/movie"
 
     # Türleri TMDb'nin beklediği ID formatına çevir
-    genre_ids = [str(GENRES.get(tur.lower())) for tur in genres_list or [] if GENRES.get(tur.lower())]
+    # (sıralı ve tekrarsız: "Romantik, Dram" ile "Dram, Romantik" aynı önbellek kaydını kullanır)
+    genre_ids = sorted({str(GENRES.get(tur.lower())) for tur in genres_list or [] if GENRES.get(tur.lower())}, key=int)
 
     # API parametreleri
     params = {
         "api_key": TMDB_API_KEY,
-        "language": "tr-TR",                   # Türkçe dilinde sonuçlar
+        "language": TMDB_LANGUAGE,             # Türkçe dilinde sonuçlar
         "sort_by": "popularity.desc",          # Popülerliğe göre sırala
         "with_genres": ",".join(genre_ids) if genre_ids else None,  # Tür filtrelemesi
         "page": 1                               # İlk sayfayı getir
     }
 
-    # API isteği gönder
-    response = requests.get(url, params=params)
-    data = response.json()
-    
+    # API isteği gönder (önbellekten karşılanabilir)
+    _, data = _get_json("discover", url, params)
+
     # Film sonuçlarını döndür
     return data.get("results", [])
 
+def get_discover_page(page, genre_id=None):
+    """
+    Katalog senkronizasyonu için discover/movie sonuç sayfasını önbelleğe yazmadan getirir.
+    :param page: 1-500 arası sayfa numarası
+    :param genre_id: verilirse sadece bu türdeki filmler
+    :return: Film sonuçlarını içeren bir liste
+    """
+    params = {
+        "api_key": TMDB_API_KEY,
+        "language": TMDB_LANGUAGE,
+        "sort_by": "popularity.desc",
+        "with_genres": genre_id,
+        "page": page
+    }
+    with metrics.span("tmdb", "discover_page"):
+        response = _call(f"{TMDB_BASE_URL}/discover/movie", params)
+        response.raise_for_status()
+        return response.json().get("results", [])
+
 def get_movie_details(movie_id):
     """
     Belirli bir film ID'si ile detaylı film bilgilerini (oyuncular dahil) getirir.
     :param movie_id: TMDb film ID'si
     :return: JSON formatında detaylı bilgi
     """
-    url = f"https://api.themoviedb.org/3/movie/{movie_id}"
+    _, data = _fetch_movie_details(movie_id)
+    return data
+
+def _fetch_movie_details(movie_id):
+    url = f"{TMDB_BASE_URL}/movie/{movie_id}"
     params = {
         "api_key": TMDB_API_KEY,
-        "language": "tr-TR",
+        "language": TMDB_LANGUAGE,
         "append_to_response": "credits"  # Oyuncular ve ekip bilgilerini de ekle
     }
 
-    # API isteği gönder
-    response = requests.get(url, params=params)
-    return response.json()
+    # API isteği gönder (önbellekten karşılanabilir)
+    return _get_json("details", url, params)
+
+def get_movie_details_many(movie_ids):
+    """
+    Birden fazla filmin detaylarını sınırlı bir iş parçacığı havuzunda paralel olarak getirir.
+    Sonuçlar girdi sırasını korur; başarısız olan çağrılar atlanır (kısmi sonuç döner).
+    :param movie_ids: TMDb film ID'lerinin listesi
+    :return: Başarıyla alınan film detaylarının listesi
+    """
+    # metrics.submit: havuzdaki çağrıların süreleri de isteğin Server-Timing değerine eklenir
+    futures = [metrics.submit(_executor, _fetch_movie_details, movie_id) for movie_id in movie_ids]
+
+    movies = []
+    for movie_id, future in zip(movie_ids, futures):
+        try:
+            status_code, movie = future.result()
+        except Exception as e:
+            print(f"❌ Film detayı alınamadı ({movie_id}):", e)
+            continue
+        if status_code == 200:
+            movies.append(movie)
+    return movies
+
+def get_movie_page(movie_id):
+    """
+    Film detay sayfası için gereken her şeyi (detaylar, oyuncular, platformlar) tek istekte getirir.
+    :param movie_id: TMDb film ID'si
+    :return: (film detayları veya bulunamazsa None, Türkiye'deki abonelik platformları listesi)
+    """
+    url = f"{TMDB_BASE_URL}/movie/{movie_id}"
+    params = {
+        "api_key": TMDB_API_KEY,
+        "language": TMDB_LANGUAGE,
+        "append_to_response": "credits,watch/providers"
+    }
+
+    status_code, data = _get_json("movie_page", url, params)
+    if status_code != 200:
+        return None, []
+
+    platforms = data.get("watch/providers", {}).get("results", {}).get("TR", {}).get("flatrate", [])
+    return data, platforms
+
+def get_movie_page_async(movie_id):
+    """get_movie_page çağrısını iş parçacığı havuzunda başlatır ve bir Future döndürür."""
+    return metrics.submit(_executor, get_movie_page, movie_id)
+
+def get_discover_page_async(page, genre_id=None):
+    """get_discover_page çağrısını iş parçacığı havuzunda başlatır ve bir Future döndürür."""
+    return metrics.submit(_executor, get_discover_page, page, genre_id)
 
 def get_watch_providers(movie_id):
     """
@@ -90,14 +297,13 @@ def get_watch_providers(movie_id):
     :param movie_id: TMDb film ID'si
     :return: Platform bilgilerini içeren liste (örneğin Netflix, Disney+ vs.)
     """
-    url = f"https://api.themoviedb.org/3/movie/{movie_id}/watch/providers"
+    url = f"{TMDB_BASE_URL}/movie/{movie_id}/watch/providers"
     params = {"api_key": TMDB_API_KEY}
 
-    # API isteği gönder
-    response = requests.get(url, params=params)
+    # API isteği gönder (önbellekten karşılanabilir)
+    status_code, data = _get_json("providers", url, params)
 
-    if response.status_code == 200:
-        data = response.json()
+    if status_code == 200:
         # Sadece Türkiye (TR) için olan ve 'flatrate' (abonelikle izlenebilir) platformları al
         return data.get("results", {}).get("TR", {}).get("flatrate", [])
     